@@ -1,10 +1,11 @@
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
 from app.chain import ChainBase
 from app.core.config import settings
-from app.core.event import EventManager
+from app.core.event import EventManager, eventmanager
 from app.db.addondata_oper import AddonDataOper
 from app.db.systemconfig_oper import SystemConfigOper
 from app.helper.message import MessageHelper
@@ -40,15 +41,31 @@ class _AddonBase(metaclass=ABCMeta):
     addon_order: int = 9999
     # minium system version
     version_required: str | None = None
+    # Process-wide singletons, shared by all addon instances
+    eventmanager: EventManager = eventmanager
+    # 系统消息
+    systemmessage: MessageHelper = MessageHelper()
+
+    __slots__ = (
+        "addondata",
+        "systemconfig",
+        "chain",
+        "_data_paths",
+        "_write_buf",
+        "_link",
+    )
 
     def __init__(self):
         self.addondata = AddonDataOper()
         self.systemconfig = SystemConfigOper()
-        self.eventmanager = EventManager()
         # 处理链
         self.chain = AddonChian()
-        # 系统消息
-        self.systemmessage = MessageHelper()
+        # Created data directories, addon ID -> path
+        self._data_paths: dict[str, Path] = {}
+        # Buffered data writes inside batched_writes(), (addon ID, key) -> value
+        self._write_buf: dict[tuple[str, str], Any] | None = None
+        # Link to the addon page, resolved on first use
+        self._link: str | None = None
 
     @abstractmethod
     def init_addon(self, config: dict = None):
@@ -175,9 +192,12 @@ class _AddonBase(metaclass=ABCMeta):
         """Get addon data storage directory."""
         if not addon_id:
             addon_id = self.__class__.__name__
+        data_path = self._data_paths.get(addon_id)
+        if data_path is not None:
+            return data_path
         data_path = settings.ADDON_DATA_PATH / f"{addon_id}"
-        if not data_path.exists():
-            data_path.mkdir(parents=True)
+        data_path.mkdir(parents=True, exist_ok=True)
+        self._data_paths[addon_id] = data_path
         return data_path
 
     def save_data(self, key: str, value: Any, addon_id: str | None = None):
@@ -189,8 +209,34 @@ class _AddonBase(metaclass=ABCMeta):
         """
         if not addon_id:
             addon_id = self.__class__.__name__
+        if self._write_buf is not None:
+            self._write_buf[(addon_id, key)] = value
+            return
         self.addondata.save(addon_id, key, value)
 
+    @contextmanager
+    def batched_writes(self):
+        """Buffer save_data() calls and write them in a single transaction on exit.
+
+        Usage:
+        with self.batched_writes():
+            for key, value in items:
+                self.save_data(key, value)
+        """
+        if self._write_buf is not None:
+            # Already batching, the outermost context flushes
+            yield
+            return
+        self._write_buf = {}
+        try:
+            yield
+        finally:
+            buf, self._write_buf = self._write_buf, None
+            if buf:
+                self.addondata.save_many(
+                    [(addon_id, key, value) for (addon_id, key), value in buf.items()]
+                )
+
     def get_data(self, key: str | None = None, addon_id: str | None = None) -> Any:
         """Get addon data.
 
@@ -199,6 +245,8 @@ class _AddonBase(metaclass=ABCMeta):
         """
         if not addon_id:
             addon_id = self.__class__.__name__
+        if self._write_buf and (addon_id, key) in self._write_buf:
+            return self._write_buf[(addon_id, key)]
         return self.addondata.get_data(addon_id, key)
 
     def del_data(self, key: str, addon_id: str | None = None) -> Any:
@@ -209,8 +257,31 @@ class _AddonBase(metaclass=ABCMeta):
         """
         if not addon_id:
             addon_id = self.__class__.__name__
+        if self._write_buf:
+            # Drop buffered writes that the deletion covers
+            for buf_key in [
+                k for k in self._write_buf if k[0] == addon_id and key in (None, k[1])
+            ]:
+                self._write_buf.pop(buf_key)
         return self.addondata.del_data(addon_id, key)
 
+    @property
+    def _default_link(self) -> str | None:
+        """Link to the addon page, used for messages without a link."""
+        if self._link is None:
+            self._link = settings.MP_DOMAIN(
+                f"#/addons?tab=installed&id={self.__class__.__name__}"
+            )
+        return self._link
+
+    def _build_notification(self, link: str | None = None, **kwargs) -> Notification:
+        """Build a notification sent by the addon.
+
+        :param link: Message link, defaults to the addon page
+        :param kwargs: Other notification fields
+        """
+        return Notification(link=link or self._default_link, **kwargs)
+
     def post_message(
         self,
         channel: MessageChannel | None = None,
@@ -224,12 +295,8 @@ class _AddonBase(metaclass=ABCMeta):
         **kwargs,
     ):
         """Send a message."""
-        if not link:
-            link = settings.MP_DOMAIN(
-                f"#/addons?tab=installed&id={self.__class__.__name__}"
-            )
         self.chain.post_message(
-            Notification(
+            self._build_notification(
                 channel=channel,
                 mtype=mtype,
                 title=title,
@@ -255,12 +322,8 @@ class _AddonBase(metaclass=ABCMeta):
         **kwargs,
     ):
         """Send a message."""
-        if not link:
-            link = settings.MP_DOMAIN(
-                f"#/addons?tab=installed&id={self.__class__.__name__}"
-            )
         await self.chain.async_post_message(
-            Notification(
+            self._build_notification(
                 channel=channel,
                 mtype=mtype,
                 title=title,
@@ -1,12 +1,20 @@
+import asyncio
+import hashlib
 import mimetypes
+import re
+import stat
+import time
+from collections.abc import Iterable
 from typing import Annotated, Any
 
-import aiofiles
-from anyio import Path as AsyncPath
 from fastapi import APIRouter, Depends, Header, HTTPException
 from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from pydantic_core import to_json
 from starlette import status
-from starlette.responses import StreamingResponse
+from starlette.responses import FileResponse, Response
+from starlette.routing import BaseRoute
+from starlette.staticfiles import NotModifiedResponse
 
 from app import schemas
 from app.core.config import settings
@@ -20,18 +28,126 @@ from app.db.user_oper import (
     get_current_active_superuser_async,
 )
 from app.factory import app
-from app.helper.addon import PluginHelper
 from app.log import logger
 from app.schemas.types import SystemConfigKey
+from app.utils.http import RequestUtils
 
 PROTECTED_ROUTES = {"/api/v1/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc"}
 PLUGIN_PREFIX = f"{settings.API_V1_STR}/plugin"
+# MIME types of the assets commonly shipped by addon frontends
+_MIME_TYPES = {
+    ".js": "application/javascript",
+    ".mjs": "application/javascript",
+    ".css": "text/css",
+    ".html": "text/html",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".wasm": "application/wasm",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".woff2": "font/woff2",
+}
+# Addon directories are named after their module, anything else is rejected
+_ADDON_ID_PATTERN = re.compile(r"\w+")
+# Freshness window of the online addon list, in seconds
+_ONLINE_CACHE_TTL = 300
+# Delay before a failed refresh of the online addon list is retried, in seconds
+_ONLINE_RETRY_INTERVAL = 60
+# Last fetched online addon list, served stale while a refresh is running,
+# "retry_ts" is the earliest time for the next refresh after a failed one
+_online_cache: dict[str, Any] = {"data": None, "ts": 0.0, "retry_ts": 0.0, "task": None}
+# Running background tasks, referenced until they are done
+_background_tasks: set[asyncio.Task] = set()
+# Routes added for each addon, addon ID -> routes
+_plugin_routes: dict[str, list[BaseRoute]] = {}
+# Serialized dashboard meta information of running addons,
+# (addon manager version, JSON)
+_dashboard_meta_cache: tuple[int, bytes] | None = None
+# Serializers of the responses sent with an ETag
+_ADDONS_ADAPTER = TypeAdapter(list[schemas.Addon])
+_DASHBOARD_ADAPTER = TypeAdapter(schemas.AddonDashboard)
 
 router = APIRouter()
 
 
-def _update_plugin_api_routes(plugin_id: str | None, action: str):
-    """Plugin API route registration and removal :param plugin_id: Plugin ID.
+async def _refresh_online_addons(force: bool = False) -> list[schemas.Addon]:
+    """Fetch the online addon list and update the cache.
+
+    A failed or empty fetch keeps the previously cached list alive, and the next
+    background refresh waits for the retry interval.
+
+    :param force: Whether to bypass the market cache.
+    :return: The cached online addon list.
+    """
+    try:
+        online_plugins = await Context.addonmanager.async_get_online_addons(force)
+    except Exception as e:
+        logger.error(f"Error refreshing online addons: {str(e)}")
+        online_plugins = None
+    now = time.monotonic()
+    if online_plugins or _online_cache["data"] is None:
+        _online_cache["data"] = online_plugins or []
+        _online_cache["ts"] = now
+    if not online_plugins:
+        _online_cache["retry_ts"] = now + _ONLINE_RETRY_INTERVAL
+    return _online_cache["data"]
+
+
+def _invalidate_online_cache():
+    """Drop the cached online addon list so that the next request refetches it."""
+    _online_cache["data"] = None
+    _online_cache["ts"] = 0.0
+    _online_cache["retry_ts"] = 0.0
+
+
+async def _get_online_cached(force: bool = False) -> list[schemas.Addon]:
+    """Get the online addon list with stale-while-revalidate semantics.
+
+    - Blocks on the network only when nothing is cached or `force` is set.
+    - Returns the cached list while it is fresh.
+    - Returns the stale list and refreshes it in the background otherwise, unless
+      the last refresh failed within the retry interval.
+
+    :param force: Whether to force a blocking refresh.
+    """
+    if force or _online_cache["data"] is None:
+        return await _refresh_online_addons(force)
+    now = time.monotonic()
+    if (
+        now - _online_cache["ts"] >= _ONLINE_CACHE_TTL
+        and now >= _online_cache["retry_ts"]
+    ):
+        task = _online_cache["task"]
+        if task is None or task.done():
+            # Keep a reference to the task so that it is not garbage collected
+            _online_cache["task"] = asyncio.create_task(_refresh_online_addons())
+    return _online_cache["data"]
+
+
+def _etag_response(
+    adapter: TypeAdapter, content: Any, if_none_match: str | None
+) -> Response:
+    """Serialize a JSON response with a weak ETag of its body.
+
+    Polling clients that already hold the same body get a 304 without it.
+
+    :param adapter: Serializer of the response content
+    :param content: The response content
+    :param if_none_match: The If-None-Match request header
+    """
+    body = adapter.dump_json(content)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = RequestUtils.generate_cache_headers(etag, "no-cache", None)
+    if if_none_match and etag.removeprefix("W/") in {
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    }:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _update_plugin_api_routes(plugin_id: str | list[str] | None, action: str):
+    """Plugin API route registration and removal :param plugin_id: Plugin ID or a
+    list of plugin IDs.
 
         - If the action is "add" and plugin_id is None, then process all plugins.
         - If the action is "remove", plugin_id must be a valid plugin ID
@@ -41,37 +157,61 @@ def _update_plugin_api_routes(plugin_id: str | None, action: str):
     if action not in {"add", "remove"}:
         raise ValueError("Action must be 'add' or 'remove'")
 
-    is_modified = False
-
-    plugin_ids = (
-        [plugin_id] if plugin_id else Context.addonmanager.get_running_plugin_ids()
+    if isinstance(plugin_id, list):
+        plugin_ids = plugin_id
+    elif plugin_id:
+        plugin_ids = [plugin_id]
+    else:
+        plugin_ids = Context.addonmanager.get_running_plugin_ids()
+    _replace_routes(
+        (
+            plugin_id,
+            Context.addonmanager.get_plugin_apis(plugin_id) if action == "add" else [],
+        )
+        for plugin_id in plugin_ids
     )
-    for plugin_id in plugin_ids:
-        routes_removed = _remove_routes(plugin_id)
-        if routes_removed:
-            is_modified = True
-
-        if action != "add":
-            continue
-        # Get the API route information of the plugin
-        plugin_apis = Context.addonmanager.get_plugin_apis(plugin_id)
-        for api in plugin_apis:
-            api.path = f"{PLUGIN_PREFIX}{api.path}"
-            try:
-                dependencies = api.kwargs.setdefault("dependencies", [])
-                if not api.auth == "anonymous":
-                    if api.auth == "bear" and Depends(verify_token) not in dependencies:
-                        dependencies.append(Depends(verify_token))
-                    elif Depends(verify_apikey) not in dependencies:
-                        dependencies.append(Depends(verify_apikey))
-                app.add_api_route(api.path, api.endpoint, **api.kwargs, tags=["plugin"])
-                is_modified = True
-                logger.debug(f"Added plugin route: {api.path}")
-            except Exception as e:
-                logger.error(f"Error adding plugin route {api.path}: {str(e)}")
-
-    if is_modified:
-        app.setup()
+
+
+def _replace_routes(changes: Iterable[tuple[str, list[schemas.AddonApi]]]):
+    """Replace the API routes of several addons, rebuilding the application routing
+    once for the whole batch and only if any route has changed.
+
+    :param changes: The addon IDs with their new API route information
+    """
+    changed = False
+    try:
+        for plugin_id, plugin_apis in changes:
+            changed |= _remove_routes(plugin_id)
+            changed |= _add_routes(plugin_id, plugin_apis)
+    finally:
+        if changed:
+            app.setup()
+
+
+def _add_routes(plugin_id: str, plugin_apis: list[schemas.AddonApi]) -> bool:
+    """Add the API routes of a single addon.
+
+    :param plugin_id: The addon ID
+    :param plugin_apis: The API route information of the addon
+    :return: Whether any routes have been added.
+    """
+    added = False
+    for api in plugin_apis:
+        api.path = f"{PLUGIN_PREFIX}{api.path}"
+        try:
+            dependencies = api.kwargs.setdefault("dependencies", [])
+            if not api.auth == "anonymous":
+                if api.auth == "bear" and Depends(verify_token) not in dependencies:
+                    dependencies.append(Depends(verify_token))
+                elif Depends(verify_apikey) not in dependencies:
+                    dependencies.append(Depends(verify_apikey))
+            app.add_api_route(api.path, api.endpoint, **api.kwargs, tags=["plugin"])
+            _plugin_routes.setdefault(plugin_id, []).append(app.routes[-1])
+            added = True
+            logger.debug(f"Added plugin route: {api.path}")
+        except Exception as e:
+            logger.error(f"Error adding plugin route {api.path}: {str(e)}")
+    return added
 
 
 def _remove_routes(plugin_id: str) -> bool:
@@ -82,8 +222,13 @@ def _remove_routes(plugin_id: str) -> bool:
     """
     if not plugin_id:
         return False
-    prefix = f"{PLUGIN_PREFIX}/{plugin_id}/"
-    routes_to_remove = [route for route in app.routes if route.path.startswith(prefix)]
+    routes_to_remove = _plugin_routes.pop(plugin_id, None)
+    if routes_to_remove is None:
+        # Not indexed, fall back to scanning all routes
+        prefix = f"{PLUGIN_PREFIX}/{plugin_id}/"
+        routes_to_remove = [
+            route for route in app.routes if route.path.startswith(prefix)
+        ]
     removed = False
     for route in routes_to_remove:
         try:
@@ -95,6 +240,26 @@ def _remove_routes(plugin_id: str) -> bool:
     return removed
 
 
+async def async_batch_register(plugin_ids: list[str] | None = None):
+    """Asynchronously register the APIs of several addons with a single routing
+    rebuild.
+
+    The API information of the addons is collected concurrently in the thread pool,
+    the route table is only modified on the event loop.
+
+    :param plugin_ids: The addon IDs, all running addons if None.
+    """
+    if plugin_ids is None:
+        plugin_ids = Context.addonmanager.get_running_plugin_ids()
+    plugin_apis = await asyncio.gather(
+        *(
+            run_in_threadpool(Context.addonmanager.get_plugin_apis, plugin_id)
+            for plugin_id in plugin_ids
+        )
+    )
+    _replace_routes(zip(plugin_ids, plugin_apis, strict=True))
+
+
 def remove_plugin_api(plugin_id: str):
     """Dynamically remove the API of a single addon.
 
@@ -108,7 +273,8 @@ async def all_addons(
     _: User = Depends(get_current_active_superuser_async),  # noqa: B008
     state: str = "all",
     force: bool = False,
-) -> list[schemas.Addon]:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """Query all addons, including local and online addons.
 
     Addon states:
@@ -116,6 +282,19 @@ async def all_addons(
         - 'market'
         - 'all'
     """
+    # The addons are already validated models, they are serialized as they are and
+    # the response model only documents the schema
+    return _etag_response(
+        _ADDONS_ADAPTER, await _list_addons(state, force), if_none_match
+    )
+
+
+async def _list_addons(state: str, force: bool) -> list[schemas.Addon]:
+    """Query addons in the given state.
+
+    :param state: Addon state, 'installed', 'market' or 'all'
+    :param force: Force to refresh the online addons
+    """
     # Local addons
     local_plugins = Context.addonmanager.get_local_addons()
     # Installed addons
@@ -128,7 +307,7 @@ async def all_addons(
     # Not installed local addons
     not_installed_plugins = [plugin for plugin in local_plugins if not plugin.installed]
 
-    online_plugins = await Context.addonmanager.async_get_online_addons(force)
+    online_plugins = await _get_online_cached(force)
     if not online_plugins:
         # No online addons fetched
         if state == "market":
@@ -136,21 +315,19 @@ async def all_addons(
             return not_installed_plugins
         return local_plugins
 
-    # Addon market list
-    market_plugins = []
     # Installed addon IDs
-    _installed_ids = [plugin.addon_id for plugin in installed_plugins]
-    # Not installed online addons or addons with updates
-    for plugin in online_plugins:
-        if plugin.addon_id not in _installed_ids:
-            market_plugins.append(plugin)
-        elif plugin.has_update:
-            market_plugins.append(plugin)
+    _installed_ids = {plugin.addon_id for plugin in installed_plugins}
+    # Addon market list: not installed online addons or addons with updates
+    market_plugins = [
+        plugin
+        for plugin in online_plugins
+        if plugin.addon_id not in _installed_ids or plugin.has_update
+    ]
     # Not installed local addons that are not in the online addons
-    _plugin_ids = [plugin.addon_id for plugin in market_plugins]
-    for plugin in not_installed_plugins:
-        if plugin.addon_id not in _plugin_ids:
-            market_plugins.append(plugin)
+    _plugin_ids = {plugin.addon_id for plugin in market_plugins}
+    market_plugins.extend(
+        plugin for plugin in not_installed_plugins if plugin.addon_id not in _plugin_ids
+    )
     # Return addon list
     if state == "market":
         # Return not installed addons
@@ -163,16 +340,24 @@ async def all_addons(
 @router.get(
     "/reload/{plugin_id}", summary="Reload plugin", response_model=schemas.Response
 )
-def reload_plugin(
+async def reload_plugin(
     plugin_id: str,
-    _: User = Depends(get_current_active_superuser),  # noqa: B008
+    _: User = Depends(get_current_active_superuser_async),  # noqa: B008
 ) -> Any:
     """Reload plugin."""
-    # Reload plugin
-    Context.addonmanager.reload_addon(plugin_id)
+    await _reload_addon(plugin_id)
     return schemas.Response(success=True)
 
 
+async def _reload_addon(plugin_id: str):
+    """Reload an addon and replace its API routes.
+
+    :param plugin_id: The addon ID
+    """
+    await run_in_threadpool(Context.addonmanager.reload_addon, plugin_id)
+    await async_batch_register([plugin_id])
+
+
 @router.get(
     "/install/{plugin_id}", summary="Install addon", response_model=schemas.Response
 )
@@ -183,15 +368,16 @@ async def install(
     _: User = Depends(get_current_active_superuser_async),  # noqa: B008
 ) -> Any:
     """Install plugin."""
+    from app.helper.addon import PluginHelper
+
     # Installed plugins
     async with addon_lock:
-        installed_addons = (
-            SystemConfigOper().get(SystemConfigKey.UserInstalledAddons) or []
-        )
+        config_oper = SystemConfigOper()
+        installed_addons = config_oper.get(SystemConfigKey.UserInstalledAddons) or []
         # Check if the plugin already exists and if it is forced to be installed,
         # otherwise only perform installation statistics
         plugin_helper = PluginHelper()
-        if not force and plugin_id in Context.addonmanager.get_addon_ids():
+        if not force and plugin_id in Context.addonmanager.addons:
             await plugin_helper.async_install_reg(pid=plugin_id)
         else:
             # The plugin does not exist or needs to be forcibly installed,
@@ -215,11 +401,12 @@ async def install(
         if plugin_id not in installed_addons:
             installed_addons.append(plugin_id)
             # Save settings
-            await SystemConfigOper().async_set(
+            await config_oper.async_set(
                 SystemConfigKey.UserInstalledAddons, installed_addons
             )
     # Reload plugin
-    await run_in_threadpool(reload_plugin, plugin_id)
+    await _reload_addon(plugin_id)
+    _invalidate_online_cache()
     return schemas.Response(success=True)
 
 
@@ -300,20 +487,35 @@ async def plugin_config(
     summary="Update plugin configuration",
     response_model=schemas.Response,
 )
-def set_plugin_config(
+async def set_plugin_config(
     plugin_id: str,
     conf: dict,
-    _: User = Depends(get_current_active_superuser),  # noqa: B008
+    _: User = Depends(get_current_active_superuser_async),  # noqa: B008
 ) -> Any:
     """Update plugin configuration."""
     # Save configuration
-    Context.addonmanager.save_plugin_config(plugin_id, conf)
-    # Re-enable the plugin
-    Context.addonmanager.terminate_addon(plugin_id)
-    Context.addonmanager.init_addon(plugin_id, conf)
+    await run_in_threadpool(Context.addonmanager.save_plugin_config, plugin_id, conf)
+    # Re-enable the plugin in the background
+    task = asyncio.create_task(_reinit_addon(plugin_id, conf))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
     return schemas.Response(success=True)
 
 
+async def _reinit_addon(plugin_id: str, conf: dict):
+    """Re-enable an addon with a new configuration.
+
+    :param plugin_id: The addon ID
+    :param conf: The addon configuration
+    """
+    async with addon_lock:
+        try:
+            await run_in_threadpool(Context.addonmanager.terminate_addon, plugin_id)
+            await run_in_threadpool(Context.addonmanager.init_addon, plugin_id, conf)
+        except Exception as e:
+            logger.error(f"Error re-enabling plugin {plugin_id}: {str(e)}")
+
+
 @router.delete(
     "/{plugin_id}", summary="Uninstall plugin", response_model=schemas.Response
 )
@@ -323,7 +525,7 @@ async def uninstall_plugin(
 ) -> Any:
     """Uninstall plugin."""
     # Check if the plugin exists
-    if plugin_id not in Context.addonmanager.get_addon_ids():
+    if plugin_id not in Context.addonmanager.addons:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Plugin {plugin_id} does not exist",
@@ -338,22 +540,23 @@ async def uninstall_plugin(
                 SystemConfigKey.UserInstalledAddons, install_plugins
             )
         # Remove the plugin from the plugin folder
-        await _remove_plugin_from_folders(plugin_id)
+        await _remove_plugin_from_folders(plugin_id, config_oper)
 
     # Remove plugin API
     remove_plugin_api(plugin_id)
     # Remove plugin
     await run_in_threadpool(Context.addonmanager.remove_addon, plugin_id)
+    _invalidate_online_cache()
     return schemas.Response(success=True)
 
 
-async def _remove_plugin_from_folders(plugin_id: str):
+async def _remove_plugin_from_folders(plugin_id: str, config_oper: SystemConfigOper):
     """Remove the specified plugin from all folders.
 
     :param plugin_id: The ID of the plugin to be removed
+    :param config_oper: The system configuration of the current request
     """
     try:
-        config_oper = SystemConfigOper()
         # Get plugin folder configuration
         folders = config_oper.get(SystemConfigKey.PluginFolders) or {}
 
@@ -387,12 +590,27 @@ async def installed(_: User = Depends(get_current_active_superuser_async)) -> An
     return SystemConfigOper().get(SystemConfigKey.UserInstalledAddons) or []
 
 
-@router.get("/dashboard/meta", summary="Get all plugin dashboard meta information")
+@router.get(
+    "/dashboard/meta",
+    summary="Get all plugin dashboard meta information",
+    response_model=list[dict],
+)
 def plugin_dashboard_meta(
     _: schemas.TokenPayload = Depends(verify_token),  # noqa: B008
-) -> list[dict]:
-    """Get all plugin dashboard meta-information."""
-    return Context.addonmanager.get_plugin_dashboard_meta()
+) -> Response:
+    """Get all plugin dashboard meta-information.
+
+    The serialized meta information is kept until the addon manager reports a new
+    version, that is until an addon is initialized or stopped by any means.
+    """
+    global _dashboard_meta_cache
+    version = Context.addonmanager.version
+    if _dashboard_meta_cache is None or _dashboard_meta_cache[0] != version:
+        _dashboard_meta_cache = (
+            version,
+            to_json(Context.addonmanager.get_plugin_dashboard_meta()),
+        )
+    return Response(content=_dashboard_meta_cache[1], media_type="application/json")
 
 
 @router.get(
@@ -404,8 +622,9 @@ def plugin_dashboard_by_key(
     plugin_id: str,
     key: str,
     user_agent: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
     _: schemas.TokenPayload = Depends(verify_token),  # noqa: B008
-) -> schemas.AddonDashboard:
+) -> Response:
     """Get the plugin dashboard according to the plugin ID."""
     dashboard = Context.addonmanager.get_plugin_dashboard(plugin_id, key, user_agent)
     if dashboard is None:
@@ -413,75 +632,86 @@ def plugin_dashboard_by_key(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Plugin {plugin_id} does not exist or call method get_dashboard() error",
         )
-    return dashboard
+    return _etag_response(_DASHBOARD_ADAPTER, dashboard, if_none_match)
 
 
-@router.get("/dashboard/{plugin_id}", summary="Get plugin dashboard configuration")
+@router.get(
+    "/dashboard/{plugin_id}",
+    summary="Get plugin dashboard configuration",
+    response_model=schemas.AddonDashboard,
+)
 def plugin_dashboard(
     plugin_id: str,
     user_agent: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
     _: schemas.TokenPayload = Depends(verify_token),  # noqa: B008
-) -> schemas.AddonDashboard:
+) -> Response:
     """Get the plugin dashboard according to the plugin ID."""
-    return plugin_dashboard_by_key(plugin_id, "", user_agent)
+    return plugin_dashboard_by_key(plugin_id, "", user_agent, if_none_match)
 
 
 @router.get("/file/{plugin_id}/{filepath:path}", summary="Get plugin static file")
-async def plugin_static_file(plugin_id: str, filepath: str):
+async def plugin_static_file(
+    plugin_id: str,
+    filepath: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
     """Get plugin static files."""
-    # Basic security check
-    if ".." in filepath or ".." in plugin_id:
+    from anyio import Path as AsyncPath
+
+    plugin_base_dir = (
+        AsyncPath(settings.ROOT_PATH) / "app" / "addons" / plugin_id.lower()
+    )
+    # Resolve symlinks and ".." segments, the file must stay inside the addon directory
+    plugin_file_path = await (plugin_base_dir / filepath).resolve()
+    if not _ADDON_ID_PATTERN.fullmatch(plugin_id) or not (
+        plugin_file_path.is_relative_to(await plugin_base_dir.resolve())
+    ):
         logger.warning(
             f"Static File API: Path traversal attempt detected: {plugin_id}/{filepath}"
         )
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
-    plugin_base_dir = (
-        AsyncPath(settings.ROOT_PATH) / "app" / "addons" / plugin_id.lower()
-    )
-    plugin_file_path = plugin_base_dir / filepath
-    if not await plugin_file_path.exists():
+    try:
+        file_stat = await plugin_file_path.stat()
+    except OSError as e:
+        # Missing, reached through a file or not accessible
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"{plugin_file_path} does not exist",
-        )
-    if not await plugin_file_path.is_file():
+        ) from e
+    if not stat.S_ISREG(file_stat.st_mode):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"{plugin_file_path} is not a file",
         )
 
-    # Determine the MIME type
-    response_type, _ = mimetypes.guess_type(str(plugin_file_path))
-    suffix = plugin_file_path.suffix.lower()
-    # Forcibly correct the MIME type of .mjs and .js
-    if suffix in [".js", ".mjs"]:
-        response_type = "application/javascript"
-    elif (
-        suffix == ".css" and not response_type
-    ):  # If guess_type does not guess css correctly, also correct it
-        response_type = "text/css"
-    elif not response_type:  # For other types that cannot be guessed
-        response_type = "application/octet-stream"
+    # Determine the MIME type, common asset types are looked up directly
+    response_type = (
+        _MIME_TYPES.get(plugin_file_path.suffix.lower())
+        or mimetypes.guess_type(plugin_file_path.name)[0]
+        or "application/octet-stream"
+    )
 
     try:
-        # Asynchronous generator function for streaming file reading
-        async def file_generator():
-            async with aiofiles.open(plugin_file_path, mode="rb") as file:
-                # 8KB block size
-                while chunk := await file.read(8192):
-                    yield chunk
-
-        return StreamingResponse(
-            file_generator(),
+        # FileResponse sends the file with sendfile() where supported and sets the
+        # ETag and Last-Modified headers from the file stat
+        response = FileResponse(
+            path=plugin_file_path,
+            stat_result=file_stat,
             media_type=response_type,
-            headers={
-                "Content-Disposition": f"inline; filename={plugin_file_path.name}"
-            },
+            filename=plugin_file_path.name,
+            content_disposition_type="inline",
         )
     except Exception as e:
         logger.error(
-            f"Error creating/sending StreamingResponse for {plugin_file_path}: {e}",
+            f"Error creating FileResponse for {plugin_file_path}: {e}",
             exc_info=True,
         )
         raise HTTPException(status_code=500, detail="Internal Server Error") from e
+    # Check If-None-Match
+    if if_none_match:
+        etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if response.headers["etag"] in etags:
+            return NotModifiedResponse(response.headers)
+    return response
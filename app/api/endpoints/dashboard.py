@@ -1,45 +1,64 @@
-from typing import Annotated, Any
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
 
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 
 from app import schemas
-from app.core.security import verify_apitoken, verify_token
+from app.core.security import verify_token_or_apitoken
 from app.scheduler import Scheduler
 from app.utils.system import SystemUtils
 
 router = APIRouter()
 
+# Lifetime of system usage samples, in seconds
+_SYS_CACHE_TTL = 0.5
+# Latest system usage samples, name -> (value, sampling time)
+_sys_cache: dict[str, tuple[Any, float]] = {}
+# Ensure only one sampling job per metric runs at a time
+_sys_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+async def _cached(name: str, fn: Callable[[], Any], ttl: float = _SYS_CACHE_TTL) -> Any:
+    """Get a system usage sample, sampling at most once per `ttl` seconds.
+
+    Sampling runs in the thread pool because it may block.
+
+    :param name: Sample name
+    :param fn: Sampling function
+    :param ttl: Lifetime of the sample, in seconds
+    """
+    async with _sys_locks[name]:
+        sample = _sys_cache.get(name)
+        if sample and time.monotonic() - sample[1] < ttl:
+            return sample[0]
+        value = await run_in_threadpool(fn)
+        _sys_cache[name] = (value, time.monotonic())
+        return value
+
 
 @router.get(
     "/schedule",
     summary="Background services",
     response_model=list[schemas.ScheduleInfo],
 )
-async def schedule(_: schemas.TokenPayload = Depends(verify_token)) -> Any:  # noqa: B008
-    """Query background service information."""
+async def schedule(
+    _: schemas.TokenPayload | str = Depends(verify_token_or_apitoken),  # noqa: B008
+) -> Any:
+    """Query background service information, authenticated by token or API_TOKEN
+    (?token=xxx)"""
     return Scheduler().list_tasks()
 
 
-@router.get(
-    "/schedule2",
-    summary="Background services (API_TOKEN)",
-    response_model=list[schemas.ScheduleInfo],
-)
-async def schedule2(_: Annotated[str, Depends(verify_apitoken)]) -> Any:  # noqa: B008
-    """Query background service information by API_TOKEN authentication (?token=xxx)"""
-    return await schedule()
-
-
 @router.get("/cpu", summary="Get current CPU usage", response_model=int)
-def cpu(_: schemas.TokenPayload = Depends(verify_token)) -> Any:  # noqa: B008
-    """Get current CPU usage."""
-    return SystemUtils.cpu_usage()
-
-
-@router.get("/cpu2", summary="Get current CPU usage (API_TOKEN)", response_model=int)
-def cpu2(_: Annotated[str, Depends(verify_apitoken)]) -> Any:  # noqa: B008
-    """Get current CPU usage API_TOKEN authentication (?token=xxx)"""
-    return cpu()
+async def cpu(
+    _: schemas.TokenPayload | str = Depends(verify_token_or_apitoken),  # noqa: B008
+) -> Any:
+    """Get current CPU usage, authenticated by token or API_TOKEN (?token=xxx)"""
+    return await _cached("cpu", SystemUtils.cpu_usage)
 
 
 @router.get(
@@ -47,35 +66,18 @@ def cpu2(_: Annotated[str, Depends(verify_apitoken)]) -> Any:  # noqa: B008
     summary="Get current memory usage and usage rate",
     response_model=list[int],
 )
-def memory(_: schemas.TokenPayload = Depends(verify_token)) -> Any:  # noqa: B008
-    """Get current memory usage rate."""
-    return SystemUtils.memory_usage()
-
-
-@router.get(
-    "/memory2",
-    summary="Get current memory usage and usage rate (API_TOKEN)",
-    response_model=list[int],
-)
-def memory2(_: Annotated[str, Depends(verify_apitoken)]) -> Any:  # noqa: B008
-    """Get the current memory usage rate API_TOKEN authentication (?token=xxx)"""
-    return memory()
+async def memory(
+    _: schemas.TokenPayload | str = Depends(verify_token_or_apitoken),  # noqa: B008
+) -> Any:
+    """Get current memory usage rate, authenticated by token or API_TOKEN
+    (?token=xxx)"""
+    return await _cached("memory", SystemUtils.memory_usage)
 
 
 @router.get("/network", summary="Get current network traffic", response_model=list[int])
-def network(_: schemas.TokenPayload = Depends(verify_token)) -> Any:  # noqa: B008
-    """Get current network traffic (uplink and downlink traffic, unit:
-
-    bytes/s)
-    """
-    return SystemUtils.network_usage()
-
-
-@router.get(
-    "/network2",
-    summary="Get current network traffic (API_TOKEN)",
-    response_model=list[int],
-)
-def network2(_: Annotated[str, Depends(verify_apitoken)]) -> Any:  # noqa: B008
-    """Get current network traffic API_TOKEN authentication (?token=xxx)"""
-    return network()
+async def network(
+    _: schemas.TokenPayload | str = Depends(verify_token_or_apitoken),  # noqa: B008
+) -> Any:
+    """Get current network traffic (uplink and downlink traffic, unit: bytes/s),
+    authenticated by token or API_TOKEN (?token=xxx)"""
+    return await _cached("network", SystemUtils.network_usage)
@@ -1,7 +1,7 @@
 from datetime import timedelta
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Form, HTTPException
+from fastapi import APIRouter, Depends, Form, HTTPException, Response
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app import schemas
@@ -9,19 +9,23 @@ from app.chain.user import UserChain
 from app.core import security
 from app.core.config import settings
 from app.helper.wallpaper import WallpaperHelper
+from app.utils.http import RequestUtils
 
 router = APIRouter()
 
+# Wallpapers are cached for an hour, so browsers may keep them as long
+_WALLPAPER_CACHE_HEADERS = RequestUtils.generate_cache_headers(None, "public", 3600)
+
 
 @router.post("/access-token", summary="Get token", response_model=schemas.Token)
-def login_access_token(
+async def login_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     otp_password: Annotated[str | None, Form()] = None,
 ) -> Any:
     """
     Get authentication token
     """
-    success, user_or_message = UserChain().user_authenticate(
+    success, user_or_message = await UserChain().async_user_authenticate(
         username=form_data.username, password=form_data.password, mfa_code=otp_password
     )
 
@@ -51,12 +55,14 @@ def login_access_token(
 @router.get(
     "/wallpaper", summary="Login page wallpaper", response_model=schemas.Response
 )
-def wallpaper() -> Any:
+async def wallpaper(response: Response) -> Any:
     """
     Get login page wallpaper
     """
-    url = WallpaperHelper().get_wallpaper()
+    url = await WallpaperHelper().async_get_wallpaper()
     if url:
+        # Failures are not cached, so the next request retries the lookup
+        response.headers.update(_WALLPAPER_CACHE_HEADERS)
         return schemas.Response(success=True, message=url)
     return schemas.Response(success=False)
 
@@ -64,8 +70,12 @@ def wallpaper() -> Any:
 @router.get(
     "/wallpapers", summary="Login page wallpapers list", response_model=list[str]
 )
-def wallpapers() -> Any:
+async def wallpapers(response: Response) -> Any:
     """
     Get login page wallpapers
     """
-    return WallpaperHelper().get_wallpapers()
+    urls = await WallpaperHelper().async_get_wallpapers()
+    if urls:
+        # An empty list is not cached, so the next request retries the lookup
+        response.headers.update(_WALLPAPER_CACHE_HEADERS)
+    return urls
@@ -1,19 +1,27 @@
 import asyncio
 import io
-from collections import deque
+import os
+import stat
+import threading
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 
 import aiofiles
+import httpx
 import yaml
 from anyio import Path as AsyncPath
+from cachetools import LRUCache
 from fastapi import APIRouter, Body, Depends, Header, HTTPException, Request, Response
-from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from PIL import Image
+from pydantic_core import from_json, to_json
 
 from app import schemas
 from app.chain.system import SystemChain
-from app.core.cache import AsyncFileCache
+from app.core.cache import AsyncCacheBackend, AsyncFileBackend, AsyncFileCache
 from app.core.config import global_vars, settings
 from app.core.ctx import Context
 from app.core.event import eventmanager
@@ -38,6 +46,230 @@ from version import APP_VERSION
 
 router = APIRouter()
 
+# Settings left out of the non-sensitive system settings
+# FIXME: When adding sensitive configuration items, you need to add exclusions here
+_GLOBAL_SETTING_EXCLUDES = frozenset(
+    {
+        "SECRET_KEY",
+        "RESOURCE_SECRET_KEY",
+        "API_TOKEN",
+        "GITHUB_TOKEN",
+        "REPO_GITHUB_TOKEN",
+    }
+)
+# Settings left out of the system environment variables
+_ENV_SETTING_EXCLUDES = frozenset({"SECRET_KEY", "RESOURCE_SECRET_KEY"})
+# Keys of the system configuration stored in the database
+_SYSTEM_CONFIG_KEYS = frozenset(item.value for item in SystemConfigKey)
+# Interval of polling log files for new content, in seconds
+_LOG_POLL_INTERVAL = 0.5
+# Remote image downloads in progress, (URL, proxy, cached) -> download
+_image_downloads: dict[tuple[str, bool, bool], asyncio.Task[httpx.Response | None]] = {}
+# Maximum number of log lines sent in one write
+_LOG_BATCH_SIZE = 100
+# Leading bytes of text documents, such as error pages, which are never images
+_TEXT_DOCUMENT_PREFIXES = (b"<", b"{", b"[")
+# Digests of image contents that passed verification
+_verified_images: LRUCache[str, bool] = LRUCache(maxsize=4096)
+_verified_images_lock = threading.Lock()
+# Pending size polls of followed log files, shared by their readers, path -> poll
+_log_polls: dict[str, asyncio.Task[int]] = {}
+# YAML dumper for Clash rules, backed by LibYAML when it is available
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+# Last rendered Clash rules, (rules, YAML, ETag)
+_rules_cache: tuple[tuple[str, ...], str, str] | None = None
+
+
+def _etag_from_stat(file_stat: os.stat_result) -> str:
+    """Build a weak ETag from the modification time and size of a file.
+
+    :param file_stat: The file status
+    """
+    return f'W/"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+def _etag_from_content(content: bytes) -> str:
+    """Build a strong ETag from a BLAKE2b hash of the content.
+
+    :param content: The response content
+    """
+    return f'"b2-{HashUtils.blake2b(content)}"'
+
+
+def _etag_json_response(content: Any, if_none_match: str | None) -> Response:
+    """Serialize a JSON response with an ETag of its body.
+
+    Clients that already hold the same body get a 304 without it.
+
+    :param content: The response content
+    :param if_none_match: The If-None-Match request header
+    """
+    body = to_json(content)
+    etag = _etag_from_content(body)
+    headers = RequestUtils.generate_cache_headers(etag, "no-cache", None)
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _poll_log_size(log_path: AsyncPath) -> int:
+    """Wait for the next poll of a log file's size.
+
+    Readers following the same file share one poll, so the file is stat'ed once
+    per interval regardless of how many clients are connected.
+
+    :param log_path: The log file path
+    :return: The size of the log file
+    """
+    key = str(log_path)
+    poll = _log_polls.get(key)
+    if poll is None or poll.done():
+
+        async def _poll() -> int:
+            await asyncio.sleep(_LOG_POLL_INTERVAL)
+            return (await log_path.stat()).st_size
+
+        poll = _log_polls[key] = asyncio.create_task(_poll())
+        poll.add_done_callback(
+            lambda done: _log_polls.pop(key) if _log_polls.get(key) is done else None
+        )
+    # A disconnecting reader must not cancel the poll of the others
+    return await asyncio.shield(poll)
+
+
+async def _stat_log_file(logfile: str) -> tuple[AsyncPath, os.stat_result]:
+    """Locate a log file in the log directory.
+
+    :param logfile: The log file name
+    :return: The log file path and its file status
+    :raises HTTPException: 404 if the file is outside the log directory or is not a
+        regular file
+    """
+    base_path = AsyncPath(settings.LOG_PATH)
+    log_path = base_path / logfile
+
+    if not await SecurityUtils.async_is_safe_path(
+        base_path=base_path, user_path=log_path, allowed_suffixes={".log"}
+    ):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    try:
+        log_stat = await log_path.stat()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Not Found") from e
+    if not stat.S_ISREG(log_stat.st_mode):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return log_path, log_stat
+
+
+async def _read_lines_reversed(
+    path: AsyncPath, end: int | None = None, chunk_size: int = 64 * 1024
+) -> AsyncGenerator[list[str]]:
+    """Read a text file backwards, yielding batches of its lines from the last to
+    the first.
+
+    Only one chunk of the file is held in memory at a time.
+
+    :param path: The file path
+    :param end: The position to read backwards from, the end of the file if None
+    :param chunk_size: The number of bytes read at a time
+    """
+    async with aiofiles.open(path, "rb") as f:
+        position = end if end is not None else await f.seek(0, os.SEEK_END)
+        # Head of the last read chunk, it may continue in the chunk before it
+        carry = b""
+        while position > 0:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            await f.seek(position)
+            lines = (await f.read(read_size) + carry).split(b"\n")
+            carry = lines.pop(0)
+            if lines:
+                yield [line.decode("utf-8", errors="ignore") for line in lines[::-1]]
+        yield [carry.decode("utf-8", errors="ignore")]
+
+
+def _is_text_document(content: bytes) -> bool:
+    """Recognize empty contents and HTML, XML or JSON documents without decoding.
+
+    :param content: The downloaded content
+    :return: Whether the content is certainly not an image
+    """
+    return not content or content[:64].lstrip()[:1] in _TEXT_DOCUMENT_PREFIXES
+
+
+def _verify_image(content: bytes):
+    """Verify that the content is a valid image by decoding its structure.
+
+    Contents verified before are remembered by their digest and not decoded again.
+
+    :param content: The image content
+    :raises Exception: If the content is not a valid image
+    """
+    digest = HashUtils.blake2b(content)
+    with _verified_images_lock:
+        if digest in _verified_images:
+            return
+    Image.open(io.BytesIO(content)).verify()  # type: ignore
+    with _verified_images_lock:
+        _verified_images[digest] = True
+
+
+async def _download_image(
+    url: str, proxy: bool, cache_backend: AsyncCacheBackend | None, cache_key: str
+) -> httpx.Response | None:
+    """Download and verify a remote image, concurrent requests for the same image
+    share one download.
+
+    :param url: Image URL
+    :param proxy: Whether to use the proxy server
+    :param cache_backend: Cache to save the image in, None to not cache it
+    :param cache_key: Cache key of the image
+    """
+    key = (url, proxy, cache_backend is not None)
+    download = _image_downloads.get(key)
+    if download is None or download.done():
+
+        async def _download() -> httpx.Response | None:
+            # Request remote image
+            referer = "https://movie.douban.com/" if "doubanio.com" in url else None
+            proxies = settings.PROXY if proxy else None
+            response = await AsyncRequestUtils(
+                ua=settings.NORMAL_USER_AGENT,
+                proxies=proxies,
+                referer=referer,
+                accept_type="image/avif,image/webp,image/apng,*/*",
+            ).get_res(url=url)
+            if not response:
+                logger.warn(f"Failed to fetch image from URL: {url}")
+                return None
+
+            # Verify that the downloaded content is a valid image, text documents are
+            # rejected at once and anything else is decoded off the event loop
+            if _is_text_document(response.content):
+                logger.warn(f"Invalid image format for URL {url}: not an image")
+                return None
+            try:
+                await run_in_threadpool(_verify_image, response.content)
+            except Exception as e:
+                logger.warn(f"Invalid image format for URL {url}: {e}")
+                return None
+
+            # Save cache
+            if cache_backend is not None:
+                await cache_backend.set(cache_key, response.content, region="images")
+                logger.debug(f"Image cached at {cache_key}")
+            return response
+
+        download = _image_downloads[key] = asyncio.create_task(_download())
+        download.add_done_callback(
+            lambda done: (
+                _image_downloads.pop(key) if _image_downloads.get(key) is done else None
+            )
+        )
+    # A disconnecting client must not cancel the download of the others
+    return await asyncio.shield(download)
+
 
 async def fetch_image(
     url: str,
@@ -71,11 +303,25 @@ async def fetch_image(
         base=settings.CACHE_PATH, ttl=settings.GLOBAL_IMAGE_CACHE_DAYS * 24 * 3600
     )
 
-    if use_cache:
-        content = await cache_backend.get(cache_path.as_posix(), region="images")
+    cache_key = cache_path.as_posix()
+    if use_cache and isinstance(cache_backend, AsyncFileBackend):
+        # Tag the cache file by its status, so a valid client copy never reads it
+        if cache_stat := await cache_backend.stat(cache_key, region="images"):
+            etag = _etag_from_stat(cache_stat)
+            headers = RequestUtils.generate_cache_headers(etag, max_age=86400 * 7)
+            if if_none_match == etag:
+                return Response(status_code=304, headers=headers)
+            # Send the cached image straight from the file
+            return FileResponse(
+                path=cache_backend.get_path(cache_key, region="images"),
+                stat_result=cache_stat,
+                media_type=UrlUtils.get_mime_type(url, "image/jpeg"),
+                headers=headers,
+            )
+    elif use_cache:
+        content = await cache_backend.get(cache_key, region="images")
         if content:
-            # Check If-None-Match
-            etag = HashUtils.md5(content)
+            etag = _etag_from_content(content)
             headers = RequestUtils.generate_cache_headers(etag, max_age=86400 * 7)
             if if_none_match == etag:
                 return Response(status_code=304, headers=headers)
@@ -86,39 +332,26 @@ async def fetch_image(
                 headers=headers,
             )
 
-    # Request remote image
-    referer = "https://movie.douban.com/" if "doubanio.com" in url else None
-    proxies = settings.PROXY if proxy else None
-    response = await AsyncRequestUtils(
-        ua=settings.NORMAL_USER_AGENT,
-        proxies=proxies,
-        referer=referer,
-        accept_type="image/avif,image/webp,image/apng,*/*",
-    ).get_res(url=url)
+    response = await _download_image(
+        url, proxy, cache_backend if use_cache else None, cache_key
+    )
     if not response:
-        logger.warn(f"Failed to fetch image from URL: {url}")
-        return None
-
-    # Verify that the downloaded content is a valid image
-    try:
-        content = response.content
-        Image.open(io.BytesIO(content)).verify()  # type: ignore
-    except Exception as e:
-        logger.warn(f"Invalid image format for URL {url}: {e}")
         return None
+    content = response.content
 
     # Get request response header
     response_headers = response.headers
     cache_control_header = response_headers.get("Cache-Control", "")
     cache_directive, max_age = RequestUtils.parse_cache_control(cache_control_header)
 
-    # Save cache
-    if use_cache:
-        await cache_backend.set(cache_path.as_posix(), content, region="images")
-        logger.debug(f"Image cached at {cache_path.as_posix()}")
+    etag = None
+    if use_cache and isinstance(cache_backend, AsyncFileBackend):
+        # Use the same tag as later cache hits
+        if cache_stat := await cache_backend.stat(cache_key, region="images"):
+            etag = _etag_from_stat(cache_stat)
 
     # Check If-None-Match
-    etag = HashUtils.md5(content)
+    etag = etag or _etag_from_content(content)
     if if_none_match == etag:
         headers = RequestUtils.generate_cache_headers(etag, cache_directive, max_age)
         return Response(status_code=304, headers=headers)
@@ -143,16 +376,7 @@ def get_global_setting(token: str):
     if token != settings.PROJECT_NAME.lower():
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    # FIXME: When adding sensitive configuration items, you need to add exclusions here
-    info = settings.dict(
-        exclude={
-            "SECRET_KEY",
-            "RESOURCE_SECRET_KEY",
-            "API_TOKEN",
-            "GITHUB_TOKEN",
-            "REPO_GITHUB_TOKEN",
-        }
-    )
+    info = settings.snapshot(exclude=_GLOBAL_SETTING_EXCLUDES)
 
     return schemas.Response(success=True, data=info)
 
@@ -189,7 +413,7 @@ async def set_setting(
         elif success is None:
             success = True
         return schemas.Response(success=success, message=message)
-    elif key in {item.value for item in SystemConfigKey}:
+    elif key in _SYSTEM_CONFIG_KEYS:
         if isinstance(value, list):
             value = list(filter(None, value))
             value = value if value else None
@@ -233,17 +457,18 @@ async def get_message(
 @router.get(
     "/env", summary="Query system configuration", response_model=schemas.Response
 )
-async def get_env_setting(_: User = Depends(get_current_active_user_async)):  # noqa: B008
+async def get_env_setting(
+    if_none_match: Annotated[str | None, Header()] = None,
+    _: User = Depends(get_current_active_user_async),  # noqa: B008
+):
     """Query system environment variables, including the current version number
     (administrator only)"""
-    info = settings.model_dump(exclude={"SECRET_KEY", "RESOURCE_SECRET_KEY"})
-    info.update(
-        {
-            "VERSION": APP_VERSION,
-            "FRONTEND_VERSION": await SystemChain().get_frontend_version(),
-        }
-    )
-    return schemas.Response(success=True, data=info)
+    info = {
+        **settings.snapshot(exclude=_ENV_SETTING_EXCLUDES),
+        "VERSION": APP_VERSION,
+        "FRONTEND_VERSION": await SystemChain().get_frontend_version(),
+    }
+    return _etag_json_response(schemas.Response(success=True, data=info), if_none_match)
 
 
 @router.post(
@@ -291,78 +516,50 @@ async def get_logging(
     _: schemas.TokenPayload = Depends(get_current_active_user_async),  # noqa: B008
 ):
     """Get real-time system log Return format SSE."""
-    base_path = AsyncPath(settings.LOG_PATH)
-    log_path = base_path / logfile
-
-    if not await SecurityUtils.async_is_safe_path(
-        base_path=base_path, user_path=log_path, allowed_suffixes={".log"}
-    ):
-        raise HTTPException(status_code=404, detail="Not Found")
-
-    if not await log_path.exists() or not await log_path.is_file():
-        raise HTTPException(status_code=404, detail="Not Found")
+    log_path, log_stat = await _stat_log_file(logfile)
 
     async def log_generator():
         try:
-            # Use a fixed-size deque to limit memory usage
-            lines_queue = deque(maxlen=max(length, 50))
-            # Get file size
-            file_stat = await log_path.stat()
-            file_size = file_stat.st_size
-
-            # Read historical logs
-            async with aiofiles.open(log_path, encoding="utf-8", errors="ignore") as f:
-                # Optimize large file reading strategy
-                if file_size > 100 * 1024:
-                    # Only read the last 100KB of content
-                    bytes_to_read = min(file_size, 100 * 1024)
-                    position = file_size - bytes_to_read
-                    await f.seek(position)
-                    content = await f.read()
-                    # Find the first complete line
-                    first_newline = content.find("\n")
-                    if first_newline != -1:
-                        content = content[first_newline + 1 :]
-                else:
-                    # Small files are read directly
-                    content = await f.read()
-
-                # Split by line and add to the queue, only keep non-empty lines
-                lines = [line.strip() for line in content.splitlines() if line.strip()]
-                # Only take the last N lines
-                for line in lines[-max(length, 50) :]:
-                    lines_queue.append(line)
+            # Read historical logs backwards, until enough non-empty lines are found
+            max_lines = max(length, 50)
+            history: list[str] = []
+            async with aclosing(
+                _read_lines_reversed(log_path, log_stat.st_size, 8 * 1024)
+            ) as batches:
+                async for batch in batches:
+                    history.extend(line.strip() for line in batch if line.strip())
+                    if len(history) >= max_lines:
+                        break
 
             # Output historical logs
-            for line in lines_queue:
+            for line in reversed(history[:max_lines]):
                 yield f"data: {line}\n\n"
 
             # Real-time monitoring of new logs
             async with aiofiles.open(log_path, encoding="utf-8", errors="ignore") as f:
-                # Move the file pointer to the end of the file and continue to monitor
-                # new content
-                await f.seek(0, 2)
-                # Record the initial file size
-                initial_stat = await log_path.stat()
-                initial_size = initial_stat.st_size
+                # Continue to monitor new content after the historical logs
+                initial_size = log_stat.st_size
+                await f.seek(initial_size)
+                partial = ""
                 # Real-time monitoring of new logs, using a shorter polling interval
                 while not global_vars.is_system_stopped:
                     if await request.is_disconnected():
                         break
                     # Check if the file has new content
-                    current_stat = await log_path.stat()
-                    current_size = current_stat.st_size
+                    current_size = await _poll_log_size(log_path)
                     if current_size > initial_size:
-                        # The file has new content, read the new line
-                        line = await f.readline()
-                        if line:
-                            line = line.strip()
-                            if line:
-                                yield f"data: {line}\n\n"
+                        # The file has new content, read it at once and keep the
+                        # unfinished last line for the next read
+                        lines = (partial + await f.read()).split("\n")
+                        partial = lines.pop()
+                        lines = [line.strip() for line in lines if line.strip()]
+                        # Send the lines in batches, one event per line
+                        for i in range(0, len(lines), _LOG_BATCH_SIZE):
+                            yield "".join(
+                                f"data: {line}\n\n"
+                                for line in lines[i : i + _LOG_BATCH_SIZE]
+                            )
                         initial_size = current_size
-                    else:
-                        # No new content, wait for a short time
-                        await asyncio.sleep(0.5)
         except asyncio.CancelledError:
             return
         except Exception as err:
@@ -378,31 +575,19 @@ async def get_logging2(
     _: schemas.TokenPayload = Depends(verify_resource_token),  # noqa: B008
 ):
     """Get system log :return text/plain."""
-    base_path = AsyncPath(settings.LOG_PATH)
-    log_path = base_path / logfile
+    log_path, log_stat = await _stat_log_file(logfile)
 
-    if not await SecurityUtils.async_is_safe_path(
-        base_path=base_path, user_path=log_path, allowed_suffixes={".log"}
-    ):
-        raise HTTPException(status_code=404, detail="Not Found")
-
-    if not await log_path.exists() or not await log_path.is_file():
-        raise HTTPException(status_code=404, detail="Not Found")
+    async def log_generator():
+        try:
+            # Output in reverse order
+            separator = ""
+            async for batch in _read_lines_reversed(log_path, log_stat.st_size):
+                yield separator + "\n".join(batch)
+                separator = "\n"
+        except Exception as e:
+            yield f"Failed to read log file: {e}"
 
-    # Return all logs as a text response
-    if not await log_path.exists():
-        return Response(content="Log file does not exist!", media_type="text/plain")
-    try:
-        # Use aiofiles to read files asynchronously
-        async with aiofiles.open(log_path, encoding="utf-8", errors="ignore") as file:
-            text = await file.read()
-        # Output in reverse order
-        text = "\n".join(text.split("\n")[::-1])
-        return Response(content=text, media_type="text/plain")
-    except Exception as e:
-        return Response(
-            content=f"Failed to read log file: {e}", media_type="text/plain"
-        )
+    return StreamingResponse(log_generator(), media_type="text/plain")
 
 
 @router.get("/img/{proxy}", summary="Image proxy")
@@ -433,23 +618,42 @@ async def proxy_img(
     summary="Query all release versions of Github",
     response_model=schemas.Response,
 )
-async def latest_version(_: schemas.TokenPayload = Depends(verify_token)):  # noqa: B008
+async def latest_version(
+    if_none_match: Annotated[str | None, Header()] = None,
+    _: schemas.TokenPayload = Depends(verify_token),  # noqa: B008
+):
     """Query all release versions from GitHub."""
     version_res = await AsyncRequestUtils(
         proxies=settings.PROXY, headers=settings.GITHUB_HEADERS
     ).get_res("https://api.github.com/repos/wumode/MitmPilot/releases")
     if version_res:
-        ver_json = version_res.json()
+        ver_json = from_json(version_res.content)
         if ver_json:
-            return schemas.Response(success=True, data=ver_json)
+            return _etag_json_response(
+                schemas.Response(success=True, data=ver_json), if_none_match
+            )
     return schemas.Response(success=False)
 
 
-@router.get("rules", summary="Clash rules")
-def get_rules(_: schemas.TokenPayload = Depends(verify_apikey)) -> PlainTextResponse:  # noqa: B008
-    rules = Context.addonmanager.get_addon_rules()
-    res = yaml.dump({"payload": rules}, allow_unicode=True)
-    return PlainTextResponse(content=res, media_type="application/x-yaml")
+@router.get("/rules", summary="Clash rules", response_class=PlainTextResponse)
+def get_rules(
+    if_none_match: Annotated[str | None, Header()] = None,
+    _: schemas.TokenPayload = Depends(verify_apikey),  # noqa: B008
+) -> Response:
+    global _rules_cache
+    rules = tuple(Context.addonmanager.get_addon_rules())
+    if _rules_cache is None or _rules_cache[0] != rules:
+        res = yaml.dump(
+            {"payload": list(rules)}, Dumper=_YAML_DUMPER, allow_unicode=True
+        )
+        _rules_cache = (rules, res, _etag_from_content(res.encode("utf-8")))
+    _, res, etag = _rules_cache
+    headers = RequestUtils.generate_cache_headers(etag, "no-cache", None)
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return PlainTextResponse(
+        content=res, media_type="application/x-yaml", headers=headers
+    )
 
 
 @router.get("/runscheduler", summary="Run service", response_model=schemas.Response)
@@ -18,6 +18,9 @@ from app.utils.otp import OtpUtils
 
 router = APIRouter()
 
+# Password must contain at least two of letters, numbers and special characters
+_PASSWORD_PATTERN = re.compile(r"^(?![a-zA-Z]+$)(?!\d+$)(?![^\da-zA-Z\s]+$).{6,50}$")
+
 
 @router.get("/", summary="All users", response_model=list[schemas.User])
 async def list_users(
@@ -56,10 +59,7 @@ async def update_user(
     """Update user."""
     user_info = user_in.model_dump()
     if user_info.get("password"):
-        # Regular expression matches that the password contains at least two of
-        # letters, numbers, and special characters
-        pattern = r"^(?![a-zA-Z]+$)(?!\d+$)(?![^\da-zA-Z\s]+$).{6,50}$"
-        if not re.match(pattern, user_info.get("password")):
+        if not _PASSWORD_PATTERN.match(user_info.get("password")):
             return schemas.Response(
                 success=False,
                 message="The password must contain at least two of letters, numbers, "
@@ -67,15 +67,15 @@ async def update_user(
             )
         user_info["hashed_password"] = get_password_hash(user_info["password"])
         user_info.pop("password")
-    user = await current_user.async_get_by_id(db, user_id=user_info["id"])
     user_name = user_info.get("name")
     if not user_name:
         return schemas.Response(success=False, message="Username cannot be empty")
     # New username deduplication
-    users = await current_user.async_list(db)
-    for u in users:
-        if u.name == user_name and u.id != user_info["id"]:
-            return schemas.Response(success=False, message="Username is already in use")
+    if await current_user.async_get_by_name_excluding_id(
+        db, name=user_name, exclude_id=user_info["id"]
+    ):
+        return schemas.Response(success=False, message="Username is already in use")
+    user = await current_user.async_get_by_id(db, user_id=user_info["id"])
     if not user:
         return schemas.Response(success=False, message="User does not exist")
     await user.async_update(db, user_info)
@@ -85,7 +85,10 @@ async def update_user(
 @router.get(
     "/config/{key}", summary="Query user configuration", response_model=schemas.Response
 )
-def get_config(key: str, current_user: User = Depends(get_current_active_user)):  # noqa: B008
+async def get_config(
+    key: str,
+    current_user: User = Depends(get_current_active_user_async),  # noqa: B008
+):
     """Query user configuration."""
     value = UserConfigOper().get(username=current_user.name, key=key)
     return schemas.Response(success=True, data={"value": value})
@@ -96,13 +99,13 @@ def get_config(key: str, current_user: User = Depends(get_current_active_user)):
     summary="Update user configuration",
     response_model=schemas.Response,
 )
-def set_config(
+async def set_config(
     key: str,
     value: Annotated[list | dict | bool | int | str | None, Body()] = None,
-    current_user: User = Depends(get_current_active_user),  # noqa: B008
+    current_user: User = Depends(get_current_active_user_async),  # noqa: B008
 ):
     """Update user configuration."""
-    UserConfigOper().set(username=current_user.name, key=key, value=value)
+    await UserConfigOper().async_set(username=current_user.name, key=key, value=value)
     return schemas.Response(success=True)
 
 
@@ -1,6 +1,7 @@
-import copy
+import asyncio
 import inspect
 import traceback
+from collections.abc import Callable
 from typing import Any
 
 from fastapi.concurrency import run_in_threadpool
@@ -17,24 +18,64 @@ from app.schemas import ComingMessage, Notification
 from app.schemas.types import EventType, MessageChannel
 from app.utils.object import ObjectUtils
 
+# Addon module function, (addon ID, addon name, function, is coroutine function,
+# is marked sync safe, addon state getter)
+_AddonMethod = tuple[str, str, Callable, bool, bool, Callable[[], bool]]
+# System module function, (module ID, module name, function, is coroutine function,
+# type of a result passed in or None if it takes no result)
+_ModuleMethod = tuple[str, str, Callable, bool, Any]
+
+
+def _is_empty_result(ret: Any) -> bool:
+    """Judge whether the result is empty, a tuple is empty if all its values are."""
+    if ret is None:
+        return True
+    if isinstance(ret, tuple):
+        return all(value is None for value in ret)
+    return False
+
 
 class ChainBase:
     """Processing chain base class."""
 
+    # Addon module functions indexed by method, shared by all chains,
+    # (addon manager version, method -> addon module functions)
+    _addon_method_index: tuple[int, dict[str, list[_AddonMethod]]] = (-1, {})
+    # System module functions by method in priority order, shared by all chains,
+    # (module manager version, method -> system module functions)
+    _module_method_index: tuple[int, dict[str, list[_ModuleMethod]]] = (-1, {})
+    # User data operations, without a bound session so they can be shared by all chains
+    _useroper: UserOper = UserOper()
+
     def __init__(self):
         """Public initialization."""
         self.eventmanager = EventManager()
         self.messagehelper = MessageHelper()
         self.messageoper = MessageOper()
         self.messagequeue = MessageQueueManager(send_callback=self.run_module)
+        # Bound methods used when sending every message and error
+        self._send_event = self.eventmanager.send_event
+        self._async_send_event = self.eventmanager.async_send_event
+        self._put_message = self.messagehelper.put
+        self._queue_message = self.messagequeue.send_message
+        self._async_queue_message = self.messagequeue.async_send_message
 
     @staticmethod
-    def __is_valid_empty(ret):
-        """Judge whether the result is empty."""
-        if isinstance(ret, tuple):
-            return all(value is None for value in ret)
-        else:
-            return ret is None
+    def _get_result_type(func: Callable) -> Any:
+        """Get the type of a result a system module function takes in.
+
+        :param func: Module function
+        :return: The type of its only argument, ``object`` if that is not annotated,
+            or None if it does not take exactly one argument
+        """
+        try:
+            param_types = ObjectUtils.get_param_types(func)
+        except Exception as err:
+            logger.debug(f"Error getting parameter types of {func}: {str(err)}")
+            return None
+        if len(param_types) != 1:
+            return None
+        return param_types[0] or object
 
     def __handle_plugin_error(
         self, err: Exception, plugin_id: str, plugin_name: str, method: str, **kwargs
@@ -42,22 +83,30 @@ class ChainBase:
         """Handle plugin module execution errors."""
         if kwargs.get("raise_exception"):
             raise
+        err_msg = str(err)
+        err_traceback = traceback.format_exc()
         logger.error(
-            f"Error running plugin {plugin_id} module {method}: "
-            f"{str(err)}\n{traceback.format_exc()}"
+            "Error running plugin %s module %s: %s\n%s",
+            plugin_id,
+            method,
+            err_msg,
+            err_traceback,
         )
-        self.messagehelper.put(
-            title=f"{plugin_name} has an error", message=str(err), role="plugin"
+        self._put_message(
+            title=f"{plugin_name} has an error", message=err_msg, role="plugin"
         )
-        self.eventmanager.send_event(
+        if not self.eventmanager.check(EventType.SystemError):
+            # Nobody handles the error event, skip building it
+            return
+        self._send_event(
             EventType.SystemError,
             {
                 "type": "plugin",
                 "addon_id": plugin_id,
                 "plugin_name": plugin_name,
                 "plugin_method": method,
-                "error": str(err),
-                "traceback": traceback.format_exc(),
+                "error": err_msg,
+                "traceback": err_traceback,
             },
         )
 
@@ -67,117 +116,194 @@ class ChainBase:
         """Handle system module execution errors."""
         if kwargs.get("raise_exception"):
             raise
+        err_msg = str(err)
+        err_traceback = traceback.format_exc()
         logger.error(
-            f"Error running module {module_id}.{method}: "
-            f"{str(err)}\n{traceback.format_exc()}"
+            "Error running module %s.%s: %s\n%s",
+            module_id,
+            method,
+            err_msg,
+            err_traceback,
         )
-        self.messagehelper.put(
-            title=f"{module_name} has an error", message=str(err), role="system"
+        self._put_message(
+            title=f"{module_name} has an error", message=err_msg, role="system"
         )
-        self.eventmanager.send_event(
+        if not self.eventmanager.check(EventType.SystemError):
+            # Nobody handles the error event, skip building it
+            return
+        self._send_event(
             EventType.SystemError,
             {
                 "type": "module",
                 "module_id": module_id,
                 "module_name": module_name,
                 "module_method": method,
-                "error": str(err),
-                "traceback": traceback.format_exc(),
+                "error": err_msg,
+                "traceback": err_traceback,
             },
         )
 
+    @staticmethod
+    def _get_addon_methods(method: str) -> list[_AddonMethod]:
+        """Get the addon module functions implementing a method.
+
+        The index is rebuilt only when the addon manager reports a new version. It
+        includes disabled addons, as an addon can be enabled or disabled at any time
+        its state is checked on each dispatch instead.
+
+        :param method: Module method
+        :return: Addon ID, addon name, function, whether it is a coroutine function,
+            whether it is marked sync safe and the state getter of each addon, in
+            addon order
+        """
+        addonmanager = Context.addonmanager
+        version, index = ChainBase._addon_method_index
+        if version != addonmanager.version:
+            # Read the version first, so a change made while building is not missed
+            version = addonmanager.version
+            index = {}
+            running_addons = addonmanager.running_addons
+            for plugin, module_dict in addonmanager.get_addon_modules(
+                check_state=False
+            ).items():
+                plugin_id, plugin_name = plugin
+                if (addon := running_addons.get(plugin_id)) is None:
+                    continue
+                for name, func in (module_dict or {}).items():
+                    if func:
+                        index.setdefault(name, []).append(
+                            (
+                                plugin_id,
+                                plugin_name,
+                                func,
+                                inspect.iscoroutinefunction(func),
+                                getattr(func, "__sync_safe__", False),
+                                addon.get_state,
+                            )
+                        )
+            ChainBase._addon_method_index = (version, index)
+        return index.get(method, [])
+
+    @staticmethod
+    def _get_module_methods(method: str) -> list[_ModuleMethod]:
+        """Get the running system module functions implementing a method.
+
+        The functions are collected once per method, until the module manager reports
+        a new version.
+
+        :param method: Module method
+        :return: Module ID, module name, function, whether it is a coroutine function,
+            and the type of a result passed in of each module, in priority order
+        """
+        modulemanager = Context.modulemanager
+        version, index = ChainBase._module_method_index
+        if version != modulemanager.version:
+            version, index = modulemanager.version, {}
+            ChainBase._module_method_index = (version, index)
+        if (module_methods := index.get(method)) is None:
+            module_methods = []
+            for module in modulemanager.get_running_modules(method):
+                module_id = module.__class__.__name__
+                module_name = modulemanager.get_running_module_name(module_id)
+                func = getattr(module, method)
+                module_methods.append(
+                    (
+                        module_id,
+                        module_name,
+                        func,
+                        inspect.iscoroutinefunction(func),
+                        ChainBase._get_result_type(func),
+                    )
+                )
+            index[method] = module_methods
+        return module_methods
+
     def __execute_addon_modules(self, method: str, result: Any, *args, **kwargs) -> Any:
         """Execute plugin module."""
-        for plugin, module_dict in Context.addonmanager.get_addon_modules().items():
-            plugin_id, plugin_name = plugin
-            if method in module_dict:
-                func = module_dict[method]
-                if func:
-                    try:
-                        logger.info(
-                            f"Request plugin {plugin_name} to execute: {method} ..."
-                        )
-                        if self.__is_valid_empty(result):
-                            # Return None, execute for the first time or need to
-                            # continue to execute the next module
-                            result = func(*args, **kwargs)
-                        elif isinstance(result, list):
-                            # Return as a list, merge when there are multiple module
-                            # running results
-                            temp = func(*args, **kwargs)
-                            if isinstance(temp, list):
-                                result.extend(temp)
-                        else:
-                            break
-                    except Exception as err:
-                        self.__handle_plugin_error(
-                            err, plugin_id, plugin_name, method, **kwargs
-                        )
+        for plugin_id, plugin_name, func, _, _, get_state in self._get_addon_methods(
+            method
+        ):
+            try:
+                if not get_state():
+                    continue
+                logger.info("Request plugin %s to execute: %s ...", plugin_name, method)
+                if _is_empty_result(result):
+                    # Return None, execute for the first time or need to
+                    # continue to execute the next module
+                    result = func(*args, **kwargs)
+                elif isinstance(result, list):
+                    # Return as a list, merge when there are multiple module
+                    # running results
+                    temp = func(*args, **kwargs)
+                    if isinstance(temp, list):
+                        result.extend(temp)
+                else:
+                    break
+            except Exception as err:
+                self.__handle_plugin_error(
+                    err, plugin_id, plugin_name, method, **kwargs
+                )
         return result
 
     async def __async_execute_plugin_modules(
         self, method: str, result: Any, *args, **kwargs
     ) -> Any:
         """Asynchronously execute plugin modules."""
-        for plugin, module_dict in Context.addonmanager.get_addon_modules().items():
-            plugin_id, plugin_name = plugin
-            if method in module_dict:
-                func = module_dict[method]
-                if func:
-                    try:
-                        logger.info(
-                            f"Request plugin {plugin_name} to execute: {method} ..."
-                        )
-                        if self.__is_valid_empty(result):
-                            # If the result is None, this is the first execution or
-                            # the next module needs to be executed
-                            if inspect.iscoroutinefunction(func):
-                                result = await func(*args, **kwargs)
-                            else:
-                                # Run synchronous plugin functions in a thread pool to
-                                # avoid blocking
-                                result = await run_in_threadpool(func, *args, **kwargs)
-                        elif isinstance(result, list):
-                            # If the result is a list, merge the results of multiple
-                            # module executions
-                            if inspect.iscoroutinefunction(func):
-                                temp = await func(*args, **kwargs)
-                            else:
-                                # Run synchronous plugin functions in a thread pool to
-                                # avoid blocking
-                                temp = await run_in_threadpool(func, *args, **kwargs)
-                            if isinstance(temp, list):
-                                result.extend(temp)
-                        else:
-                            break
-                    except Exception as err:
-                        self.__handle_plugin_error(
-                            err, plugin_id, plugin_name, method, **kwargs
-                        )
+        for (
+            plugin_id,
+            plugin_name,
+            func,
+            is_coro,
+            is_sync_safe,
+            get_state,
+        ) in self._get_addon_methods(method):
+            try:
+                if not get_state():
+                    continue
+                logger.info("Request plugin %s to execute: %s ...", plugin_name, method)
+                if _is_empty_result(result):
+                    # If the result is None, this is the first execution or
+                    # the next module needs to be executed
+                    merge = False
+                elif isinstance(result, list):
+                    # If the result is a list, merge the results of multiple
+                    # module executions
+                    merge = True
+                else:
+                    break
+                if is_coro:
+                    temp = await func(*args, **kwargs)
+                elif is_sync_safe:
+                    temp = func(*args, **kwargs)
+                else:
+                    # Run synchronous plugin functions in a thread pool to avoid
+                    # blocking
+                    temp = await run_in_threadpool(func, *args, **kwargs)
+                if not merge:
+                    result = temp
+                elif isinstance(temp, list):
+                    result.extend(temp)
+            except Exception as err:
+                self.__handle_plugin_error(
+                    err, plugin_id, plugin_name, method, **kwargs
+                )
         return result
 
     def __execute_system_modules(
         self, method: str, result: Any, *args, **kwargs
     ) -> Any:
         """Execute system module."""
-        logger.debug(f"Request system module to execute: {method} ...")
-        for module in sorted(
-            Context.modulemanager.get_running_modules(method),
-            key=lambda x: x.get_priority(),
-        ):
-            module_id = module.__class__.__name__
-            try:
-                module_name = module.get_name()
-            except Exception as err:
-                logger.debug(f"Error getting module name: {str(err)}")
-                module_name = module_id
+        module_methods = self._get_module_methods(method)
+        if not module_methods:
+            return result
+        logger.debug("Request system module to execute: %s ...", method)
+        for module_id, module_name, func, _, result_type in module_methods:
             try:
-                func = getattr(module, method)
-                if self.__is_valid_empty(result):
+                if _is_empty_result(result):
                     # Return None, execute for the first time or need to continue to
                     # execute the next module
                     result = func(*args, **kwargs)
-                elif ObjectUtils.check_signature(func, result):
+                elif result_type is not None and isinstance(result, result_type):
                     # The return result is consistent with the method signature, and
                     # the result is passed in
                     result = func(result)
@@ -200,40 +326,33 @@ class ChainBase:
         self, method: str, result: Any, *args, **kwargs
     ) -> Any:
         """Asynchronously execute system modules."""
-        logger.debug(f"Request system module to execute: {method} ...")
-        for module in sorted(
-            Context.modulemanager.get_running_modules(method),
-            key=lambda x: x.get_priority(),
-        ):
-            module_id = module.__class__.__name__
-            try:
-                module_name = module.get_name()
-            except Exception as err:
-                logger.debug(f"Error getting module name: {str(err)}")
-                module_name = module_id
+        module_methods = self._get_module_methods(method)
+        if not module_methods:
+            return result
+        logger.debug("Request system module to execute: %s ...", method)
+        for (
+            module_id,
+            module_name,
+            func,
+            is_coro,
+            result_type,
+        ) in module_methods:
             try:
-                func = getattr(module, method)
-                if self.__is_valid_empty(result):
+                if _is_empty_result(result):
                     # Return None, execute for the first time or need to continue to
                     # execute the next module
-                    if inspect.iscoroutinefunction(func):
-                        result = await func(*args, **kwargs)
-                    else:
-                        result = func(*args, **kwargs)
-                elif ObjectUtils.check_signature(func, result):
+                    ret = func(*args, **kwargs)
+                    result = await ret if is_coro else ret
+                elif result_type is not None and isinstance(result, result_type):
                     # The return result is consistent with the method signature, and
                     # the result is passed in
-                    if inspect.iscoroutinefunction(func):
-                        result = await func(result)
-                    else:
-                        result = func(result)
+                    ret = func(result)
+                    result = await ret if is_coro else ret
                 elif isinstance(result, list):
                     # Return as a list, merge when there are multiple module
                     # running results
-                    if inspect.iscoroutinefunction(func):
-                        temp = await func(*args, **kwargs)
-                    else:
-                        temp = func(*args, **kwargs)
+                    ret = func(*args, **kwargs)
+                    temp = await ret if is_coro else ret
                     if isinstance(temp, list):
                         result.extend(temp)
                 else:
@@ -254,13 +373,14 @@ class ChainBase:
         """
         result = None
 
-        # Execute plugin module
-        result = self.__execute_addon_modules(method, result, *args, **kwargs)
+        if Context.addonmanager.has_running_addons():
+            # Execute plugin module
+            result = self.__execute_addon_modules(method, result, *args, **kwargs)
 
-        if not self.__is_valid_empty(result) and not isinstance(result, list):
-            # The plugin module returns a result that is not empty and not a list,
-            # and returns directly
-            return result
+            if not _is_empty_result(result) and not isinstance(result, list):
+                # The plugin module returns a result that is not empty and not a
+                # list, and returns directly
+                return result
 
         # Execute system module
         return self.__execute_system_modules(method, result, *args, **kwargs)
@@ -275,15 +395,16 @@ class ChainBase:
         """
         result = None
 
-        # Execute plugin module
-        result = await self.__async_execute_plugin_modules(
-            method, result, *args, **kwargs
-        )
+        if Context.addonmanager.has_running_addons():
+            # Execute plugin module
+            result = await self.__async_execute_plugin_modules(
+                method, result, *args, **kwargs
+            )
 
-        if not self.__is_valid_empty(result) and not isinstance(result, list):
-            # The plugin module returns a result that is not empty and not a list,
-            # and returns directly
-            return result
+            if not _is_empty_result(result) and not isinstance(result, list):
+                # The plugin module returns a result that is not empty and not a
+                # list, and returns directly
+                return result
 
         # Execute system module
         return await self.__async_execute_system_modules(
@@ -347,6 +468,38 @@ class ChainBase:
         cache event."""
         self.run_module("clear_cache")
 
+    @staticmethod
+    def _notification_actions(message: Notification) -> list[str]:
+        """Get the message isolation actions of a notification.
+
+        :param message: Notification instance
+        :return: The actions, empty if the notification is not isolated
+        """
+        if message.userid or not message.mtype:
+            return []
+        # Message isolation settings
+        notify_action = ServiceConfigHelper.get_notification_switch(message.mtype)
+        if not notify_action:
+            return []
+        # 'admin' 'user,admin' 'user' 'all'
+        return notify_action.split(",")
+
+    @staticmethod
+    def _notification_usernames(message: Notification, actions: list[str]) -> list[str]:
+        """Get the users whose message IDs the isolation actions may need.
+
+        :param message: Notification instance
+        :param actions: Message isolation actions
+        :return: The usernames
+        """
+        usernames = []
+        if "admin" in actions or "user" in actions:
+            # The admin also receives messages of users that are not found
+            usernames.append(settings.SUPERUSER)
+        if "user" in actions and message.username:
+            usernames.append(message.username)
+        return usernames
+
     @staticmethod
     def _prepare_notifications(
         message: Notification,
@@ -357,76 +510,96 @@ class ChainBase:
         :return: The list of specific notifications to send, and a boolean indicating
             whether the original notification should also be sent.
         """
+        actions = ChainBase._notification_actions(message)
+        if not actions:
+            return [], True
+        user_settings = ChainBase._useroper.get_settings_by_names(
+            ChainBase._notification_usernames(message, actions)
+        )
+        return ChainBase._split_notifications(message, actions, user_settings)
+
+    @staticmethod
+    async def _async_prepare_notifications(
+        message: Notification,
+    ) -> tuple[list[Notification], bool]:
+        """Asynchronously prepare notifications based on settings.
+
+        :param message: Notification instance
+        :return: The list of specific notifications to send, and a boolean indicating
+            whether the original notification should also be sent.
+        """
+        actions = ChainBase._notification_actions(message)
+        if not actions:
+            return [], True
+        user_settings = await ChainBase._useroper.async_get_settings_by_names(
+            ChainBase._notification_usernames(message, actions)
+        )
+        return ChainBase._split_notifications(message, actions, user_settings)
+
+    @staticmethod
+    def _split_notifications(
+        message: Notification, actions: list[str], user_settings: dict[str, dict]
+    ) -> tuple[list[Notification], bool]:
+        """Split a notification into specific notifications by isolation actions.
+
+        :param message: Notification instance
+        :param actions: Message isolation actions
+        :param user_settings: Personalized settings of the users, by username
+        :return: The list of specific notifications to send, and a boolean indicating
+            whether the original notification should also be sent.
+        """
         specific_notifications = []
-        send_original = True
-
-        if not message.userid and message.mtype:
-            # Message isolation settings
-            notify_action = ServiceConfigHelper.get_notification_switch(message.mtype)
-            if notify_action:
-                # 'admin' 'user,admin' 'user' 'all'
-                actions = notify_action.split(",")
-                # Flag indicating if the message has been sent to the admin
-                admin_sended = False
-                send_original = False
-                useroper = UserOper()
-                for action in actions:
-                    send_message = copy.deepcopy(message)
-                    if action == "admin" and not admin_sended:
-                        # Send the message to admin only
+        # Flag indicating if the message has been sent to the admin
+        admin_sended = False
+        for action in actions:
+            send_message = message.model_copy()
+            if action == "admin" and not admin_sended:
+                # Send the message to admin only
+                logger.info(
+                    f"Message of type {send_message.mtype} is set to be sent "
+                    f"to the admin"
+                )
+                # Read admin message IDs
+                send_message.targets = user_settings.get(settings.SUPERUSER)
+                admin_sended = True
+            elif action == "user" and send_message.username:
+                # Sending the message to the corresponding user
+                logger.info(
+                    f"Message of type {send_message.mtype} is set to be sent "
+                    f"to user {send_message.username}"
+                )
+                # Read user message IDs
+                send_message.targets = user_settings.get(send_message.username)
+                if send_message.targets is None:
+                    # User not found
+                    if not admin_sended:
+                        # Fallback to sending to admin
                         logger.info(
-                            f"Message of type {send_message.mtype} is set to be sent "
-                            f"to the admin"
+                            f"User {send_message.username} not found, the "
+                            f"message will be sent to the admin"
                         )
                         # Read admin message IDs
-                        send_message.targets = useroper.get_settings(settings.SUPERUSER)
+                        send_message.targets = user_settings.get(settings.SUPERUSER)
                         admin_sended = True
-                    elif action == "user" and send_message.username:
-                        # Sending the message to the corresponding user
+                    else:
+                        # Admin has already been sent this message,
+                        # so it won't be sent again
                         logger.info(
-                            f"Message of type {send_message.mtype} is set to be sent "
-                            f"to user {send_message.username}"
+                            f"User {send_message.username} not found, "
+                            f"the message cannot be sent to the "
+                            f"corresponding user"
                         )
-                        # Read user message IDs
-                        send_message.targets = useroper.get_settings(
-                            send_message.username
-                        )
-                        if send_message.targets is None:
-                            # User not found
-                            if not admin_sended:
-                                # Fallback to sending to admin
-                                logger.info(
-                                    f"User {send_message.username} not found, the "
-                                    f"message will be sent to the admin"
-                                )
-                                # Read admin message IDs
-                                send_message.targets = useroper.get_settings(
-                                    settings.SUPERUSER
-                                )
-                                admin_sended = True
-                            else:
-                                # Admin has already been sent this message,
-                                # so it won't be sent again
-                                logger.info(
-                                    f"User {send_message.username} not found, "
-                                    f"the message cannot be sent to the "
-                                    f"corresponding user"
-                                )
-                                continue
-                        elif send_message.username == settings.SUPERUSER:
-                            # Sent because the username is the same as the admin's
-                            admin_sended = True
-                    else:
-                        # Send to all according to the original message
-                        if not admin_sended:
-                            send_original = True
-                        break
-                    specific_notifications.append(send_message)
-
-                if not send_original:
-                    return specific_notifications, False
-
-        return specific_notifications, send_original
+                        continue
+                elif send_message.username == settings.SUPERUSER:
+                    # Sent because the username is the same as the admin's
+                    admin_sended = True
+            else:
+                # Send to all according to the original message, unless the admin
+                # has already been sent this message
+                return specific_notifications, not admin_sended
+            specific_notifications.append(send_message)
+
+        return specific_notifications, False
 
     def post_message(self, message: Notification, **kwargs) -> None:
         """Send a message.
@@ -442,30 +615,31 @@ class ChainBase:
             logger.warning("Message is empty, skipping sending")
             return
         # Save the message
-        self.messagehelper.put(message, role="user", title=message.title)
-        self.messageoper.add(**message.model_dump())
+        self._put_message(message, role="user", title=message.title)
+        message_dict = message.model_dump()
+        self.messageoper.add(**message_dict)
 
         specific_notifications, send_original = ChainBase._prepare_notifications(
             message
         )
 
         for msg in specific_notifications:
-            self.eventmanager.send_event(
+            self._send_event(
                 etype=EventType.NoticeMessage,
                 data={**msg.model_dump(), "type": msg.mtype},
             )
-            self.messagequeue.send_message("post_message", message=msg)
+            self._queue_message("post_message", message=msg)
 
         if not send_original:
             return
 
         # Send message event
-        self.eventmanager.send_event(
+        self._send_event(
             etype=EventType.NoticeMessage,
-            data={**message.model_dump(), "type": message.mtype},
+            data={**message_dict, "type": message.mtype},
         )
         # Send the message according to the original message
-        self.messagequeue.send_message(
+        self._queue_message(
             "post_message",
             message=message,
             immediately=True if message.userid else False,
@@ -485,30 +659,37 @@ class ChainBase:
             logger.warning("Message is empty, skipping sending")
             return
         # Save the message
-        self.messagehelper.put(message, role="user", title=message.title)
-        await self.messageoper.async_add(**message.model_dump())
-
-        specific_notifications, send_original = ChainBase._prepare_notifications(
-            message
-        )
-
+        self._put_message(message, role="user", title=message.title)
+        message_dict = message.model_dump()
+        # Store the message while the notifications are prepared
+        save_task = asyncio.create_task(self.messageoper.async_add(**message_dict))
+        try:
+            (
+                specific_notifications,
+                send_original,
+            ) = await ChainBase._async_prepare_notifications(message)
+        finally:
+            await save_task
+
+        # Broadcast events and queued messages are only enqueued here and never
+        # suspend, so they are awaited in turn rather than gathered as tasks
         for msg in specific_notifications:
-            await self.eventmanager.async_send_event(
+            await self._async_send_event(
                 etype=EventType.NoticeMessage,
                 data={**msg.model_dump(), "type": msg.mtype},
             )
-            await self.messagequeue.async_send_message("post_message", message=msg)
+            await self._async_queue_message("post_message", message=msg)
 
         if not send_original:
             return
 
         # Send message event
-        await self.eventmanager.async_send_event(
+        await self._async_send_event(
             etype=EventType.NoticeMessage,
-            data={**message.model_dump(), "type": message.mtype},
+            data={**message_dict, "type": message.mtype},
         )
         # Send the message according to the original message
-        await self.messagequeue.async_send_message(
+        await self._async_queue_message(
             "post_message",
             message=message,
             immediately=True if message.userid else False,
@@ -1,26 +1,39 @@
+import asyncio
 import re
 from pathlib import Path
 
 import aiofiles
 
 from app.chain import ChainBase
+from app.core.cache import cached
 from app.core.config import settings
 from app.log import logger
-from app.utils.http import RequestUtils
+from app.utils.http import AsyncRequestUtils
 from version import APP_VERSION, FRONTEND_VERSION
 
+# Numbers of a version tag, compared in order to find the latest version
+_VERSION_NUMBER_PATTERN = re.compile(r"\d+")
+
 
 class SystemChain(ChainBase):
     """System-level processing chain."""
 
     _restart_file = "__system_restart__"
+    # Frontend version read from the version file, ((file, modification time), version)
+    _frontend_version: tuple[tuple[Path, float], str] | None = None
 
     async def __get_version_message(self) -> str:
         """Get version information text."""
-        server_release_version = self.__get_server_release_version()
-        front_release_version = self.__get_front_release_version()
+        (
+            server_release_version,
+            front_release_version,
+            front_local_version,
+        ) = await asyncio.gather(
+            self.__async_get_release_version("wumode/MitmPilot", "backend"),
+            self.__async_get_release_version("wumode/MitmPilot-Frontend", "frontend"),
+            self.get_frontend_version(),
+        )
         server_local_version = self.get_server_local_version()
-        front_local_version = await self.get_frontend_version()
         if server_release_version == server_local_version:
             title = (
                 f"Current backend version: {server_local_version}, "
@@ -44,59 +57,40 @@ class SystemChain(ChainBase):
         return title
 
     @staticmethod
-    def __get_server_release_version():
-        """Get the latest version of the backend V2."""
-        try:
-            # Get a list of all released versions
-            response = RequestUtils(
-                proxies=settings.PROXY, headers=settings.GITHUB_HEADERS
-            ).get_res("https://api.github.com/repos/wumode/MitmPilot/releases")
-            if response:
-                releases = [release["tag_name"] for release in response.json()]
-                if not releases:
-                    logger.warn("Error getting the latest version of the backend!")
-                else:
-                    # Find the latest version
-                    latest = sorted(
-                        releases, key=lambda s: list(map(int, re.findall(r"\d+", s)))
-                    )[-1]
-                    logger.info(f"Get the latest backend version: {latest}")
-                    return latest
-            else:
-                logger.error(
-                    "Unable to obtain backend version information, "
-                    "please check the network connection or GitHub API request."
-                )
-        except Exception as err:
-            logger.error(f"Failed to get the latest backend version: {str(err)}")
-        return None
+    @cached(maxsize=2, ttl=300)
+    async def __async_get_release_version(repo: str, component: str) -> str | None:
+        """Asynchronously get the latest released version of a GitHub repository.
 
-    @staticmethod
-    def __get_front_release_version():
-        """Get the latest version of the frontend V2."""
+        :param repo: GitHub repository, such as wumode/MitmPilot
+        :param component: Component name used in the logs, backend or frontend
+        :return: The latest version, None if it cannot be obtained
+        """
         try:
             # Get a list of all released versions
-            response = RequestUtils(
+            response = await AsyncRequestUtils(
                 proxies=settings.PROXY, headers=settings.GITHUB_HEADERS
-            ).get_res("https://api.github.com/repos/wumode/MitmPilot-Frontend/releases")
+            ).get_res(f"https://api.github.com/repos/{repo}/releases")
             if response:
                 releases = [release["tag_name"] for release in response.json()]
                 if not releases:
-                    logger.warn("Error getting the latest version of the frontend!")
+                    logger.warn(f"Error getting the latest version of the {component}!")
                 else:
-                    # Find the latest version
-                    latest = sorted(
-                        releases, key=lambda s: list(map(int, re.findall(r"\d+", s)))
-                    )[-1]
-                    logger.info(f"Get the latest frontend version: {latest}")
+                    # Find the latest version, the last one of equal versions
+                    latest = max(
+                        reversed(releases),
+                        key=lambda s: tuple(
+                            int(n) for n in _VERSION_NUMBER_PATTERN.findall(s)
+                        ),
+                    )
+                    logger.info(f"Get the latest {component} version: {latest}")
                     return latest
             else:
                 logger.error(
-                    "Unable to obtain frontend version information, "
+                    f"Unable to obtain {component} version information, "
                     "please check the network connection or GitHub API request."
                 )
         except Exception as err:
-            logger.error(f"Failed to get the latest frontend version: {str(err)}")
+            logger.error(f"Failed to get the latest {component} version: {str(err)}")
         return None
 
     @staticmethod
@@ -108,11 +102,20 @@ class SystemChain(ChainBase):
     async def get_frontend_version():
         """Get frontend version."""
         version_file = Path(settings.FRONTEND_PATH) / "version.txt"
-        if version_file.exists():
-            try:
-                async with aiofiles.open(version_file) as f:
-                    version = str(await f.read()).strip()
-                return version
-            except Exception as err:
-                logger.debug(f"Error loading version file {version_file}: {str(err)}")
+        try:
+            mtime = version_file.stat().st_mtime
+        except OSError:
+            return FRONTEND_VERSION
+        cache_key = (version_file, mtime)
+        cached_version = SystemChain._frontend_version
+        if cached_version and cached_version[0] == cache_key:
+            # The version file has not changed since it was read
+            return cached_version[1]
+        try:
+            async with aiofiles.open(version_file) as f:
+                version = str(await f.read()).strip()
+            SystemChain._frontend_version = (cache_key, version)
+            return version
+        except Exception as err:
+            logger.debug(f"Error loading version file {version_file}: {str(err)}")
         return FRONTEND_VERSION
@@ -1,12 +1,18 @@
-import secrets
-from collections.abc import Callable
+import hashlib
+import hmac
 from typing import Literal
 
+from fastapi.concurrency import run_in_threadpool
+
 from app.chain import ChainBase
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (
+    UNUSABLE_PASSWORD_PREFIX,
+    get_unusable_password,
+    verify_password,
+)
 from app.db.models.user import User
-from app.db.user_oper import UserOper
 from app.log import logger
 from app.schemas import AuthCredentials, AuthInterceptCredentials
 from app.schemas.types import ChainEventType
@@ -15,11 +21,34 @@ PASSWORD_INVALID_CREDENTIALS_MESSAGE = (
     "Incorrect username or password or secondary verification code"
 )
 
+# Recently verified passwords, HMAC of the credentials -> verified password hash
+_verified_passwords = TTLCache(region="verified_password", maxsize=1024, ttl=60)
+# Recently rejected passwords, HMAC of the credentials -> password hash they failed
+_rejected_passwords = TTLCache(region="rejected_password", maxsize=10000, ttl=60)
+
+
+class _AnonymizedToken:
+    """Token shown half masked in logs, only built when the record is emitted."""
+
+    __slots__ = ("token",)
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def __str__(self) -> str:
+        return f"{self.token[: len(self.token) // 2]}********"
+
 
 class UserChain(ChainBase):
     """User chain, handling multiple authentication protocols."""
 
-    def user_authenticate(
+    # Names of the methods handling each grant type
+    _auth_handlers: dict[str, str] = {
+        "password": "_async_authenticate_by_password",
+        "authorization_code": "_async_authenticate_by_authorization_code",
+    }
+
+    async def async_user_authenticate(
         self,
         username: str | None = None,
         password: str | None = None,
@@ -27,8 +56,12 @@ class UserChain(ChainBase):
         code: str | None = None,
         grant_type: str = "password",
     ) -> tuple[Literal[True], User] | tuple[Literal[False], str]:
-        """Authenticate users and handle different authentication processes according to
-        different grant_type.
+        """Asynchronously authenticate users and handle different authentication
+        processes according to different grant_type.
+
+        Password verification runs in a worker thread so the event loop stays free
+        while the hash is computed, auxiliary authentication runs the synchronous
+        flow in a worker thread.
 
         :param username: Username, applicable to "password" grant_type
         :param password: User password, applicable to "password" grant_type
@@ -40,6 +73,11 @@ class UserChain(ChainBase):
             - For successful authentication, return (True, User)
             - For failed authentication, return (False, "Error message")
         """
+        handler_name = self._auth_handlers.get(grant_type)
+        if not handler_name:
+            logger.debug("Authentication type %s is not implemented", grant_type)
+            return False, "Unsupported authentication type"
+
         credentials = AuthCredentials(
             username=username,
             password=password,
@@ -48,37 +86,23 @@ class UserChain(ChainBase):
             grant_type=grant_type,
         )
         logger.debug(
-            f"Authentication type: {grant_type}, "
-            f"preparing to verify the identity of user {username}"
+            "Authentication type: %s, preparing to verify the identity of user %s",
+            grant_type,
+            username,
         )
+        return await getattr(self, handler_name)(credentials)
 
-        auth_handlers: dict[
-            str,
-            Callable[
-                [AuthCredentials],
-                tuple[Literal[True], User] | tuple[Literal[False], str],
-            ],
-        ] = {
-            "password": self._authenticate_by_password,
-            "authorization_code": self._authenticate_by_authorization_code,
-        }
-
-        handler = auth_handlers.get(grant_type)
-        if not handler:
-            logger.debug(f"Authentication type {grant_type} is not implemented")
-            return False, "Unsupported authentication type"
-
-        return handler(credentials)
-
-    def _authenticate_by_password(
+    async def _async_authenticate_by_password(
         self, credentials: AuthCredentials
     ) -> tuple[Literal[True], User] | tuple[Literal[False], str]:
-        """Process password authentication flow."""
-        success, user_or_message = self.password_authenticate(credentials=credentials)
+        """Asynchronously process password authentication flow."""
+        success, user_or_message = await self.async_password_authenticate(
+            credentials=credentials
+        )
         if success:
             logger.info(
-                f"User {credentials.username} "
-                f"passed password authentication successfully"
+                "User %s passed password authentication successfully",
+                credentials.username,
             )
             return True, user_or_message
 
@@ -88,8 +112,8 @@ class UserChain(ChainBase):
                 "Password authentication failed, trying to perform auxiliary "
                 "authentication through an external service..."
             )
-            aux_success, aux_user_or_message = self.auxiliary_authenticate(
-                credentials=credentials
+            aux_success, aux_user_or_message = await run_in_threadpool(
+                self.auxiliary_authenticate, credentials
             )
             if aux_success:
                 return True, aux_user_or_message
@@ -97,18 +121,19 @@ class UserChain(ChainBase):
                 return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
         else:
             logger.debug(
-                f"Auxiliary authentication is not enabled, "
-                f"user {credentials.username} authentication failed"
+                "Auxiliary authentication is not enabled, "
+                "user %s authentication failed",
+                credentials.username,
             )
             return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
 
-    def _authenticate_by_authorization_code(
+    async def _async_authenticate_by_authorization_code(
         self, credentials: AuthCredentials
     ) -> tuple[Literal[True], User] | tuple[Literal[False], str]:
-        """Process authorization code authentication flow."""
+        """Asynchronously process authorization code authentication flow."""
         if settings.AUXILIARY_AUTH_ENABLE:
-            aux_success, aux_user_or_message = self.auxiliary_authenticate(
-                credentials=credentials
+            aux_success, aux_user_or_message = await run_in_threadpool(
+                self.auxiliary_authenticate, credentials
             )
             if aux_success:
                 return True, aux_user_or_message
@@ -118,10 +143,11 @@ class UserChain(ChainBase):
             return False, "Authentication failed"
 
     @staticmethod
-    def password_authenticate(
+    async def async_password_authenticate(
         credentials: AuthCredentials,
     ) -> tuple[Literal[True], User] | tuple[Literal[False], str]:
-        """Password authentication.
+        """Asynchronous password authentication, the password hash is verified in a
+        worker thread.
 
         :param credentials: Authentication credentials, including username,
                             password, and optional MFA authentication code
@@ -135,32 +161,86 @@ class UserChain(ChainBase):
                 "Password authentication failed, authentication type does not match"
             )
             return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
-        assert isinstance(credentials.username, str)
-        assert isinstance(credentials.password, str)
-        user = UserOper().get_by_name(name=credentials.username)
+        if not (
+            isinstance(credentials.username, str)
+            and isinstance(credentials.password, str)
+        ):
+            logger.info("Password authentication failed, missing username or password")
+            return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
+        user = await UserChain._useroper.async_get_by_name(name=credentials.username)
         if not user:
             logger.info(
-                f"Password authentication failed, "
-                f"user {credentials.username} does not exist"
+                "Password authentication failed, user %s does not exist",
+                credentials.username,
+            )
+            # Spend as long as a password check would, not to reveal the user
+            await run_in_threadpool(
+                UserChain._verify_password,
+                credentials.username,
+                credentials.password,
+                UNUSABLE_PASSWORD_PREFIX,
             )
             return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
 
         if not user.is_active:
             logger.info(
-                f"Password authentication failed, "
-                f"user {credentials.username} has been disabled"
+                "Password authentication failed, user %s has been disabled",
+                credentials.username,
+            )
+            # Spend as long as a password check would, not to reveal the user
+            await run_in_threadpool(
+                UserChain._verify_password,
+                credentials.username,
+                credentials.password,
+                UNUSABLE_PASSWORD_PREFIX,
             )
             return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
 
-        if not verify_password(credentials.password, str(user.hashed_password)):
+        if not await run_in_threadpool(
+            UserChain._verify_password,
+            credentials.username,
+            credentials.password,
+            str(user.hashed_password),
+        ):
             logger.info(
-                f"Password authentication failed, "
-                f"the password verification of user {credentials.username} failed"
+                "Password authentication failed, "
+                "the password verification of user %s failed",
+                credentials.username,
             )
             return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
 
         return True, user
 
+    @staticmethod
+    def _verify_password(username: str, password: str, hashed_password: str) -> bool:
+        """Verify the password of a user, skipping the hash computation when the same
+        password was verified or rejected against the same hash within the last
+        minute, so replayed credentials do not cost a hash computation each.
+
+        :param username: Username
+        :param password: Plain password
+        :param hashed_password: Password hash stored for the user
+        :return: Whether the password is correct
+        """
+        cache_key = hmac.new(
+            settings.SECRET_KEY.encode(),
+            f"{username}\0{password}".encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        verified_hash = _verified_passwords.get(cache_key)
+        # Secrets are compared with hmac.compare_digest, never with ==
+        if verified_hash and hmac.compare_digest(verified_hash, hashed_password):
+            return True
+        rejected_hash = _rejected_passwords.get(cache_key)
+        if rejected_hash and hmac.compare_digest(rejected_hash, hashed_password):
+            return False
+        if not verify_password(password, hashed_password):
+            _rejected_passwords[cache_key] = hashed_password
+            return False
+        # Changing the password changes the hash, so the entry stops matching
+        _verified_passwords[cache_key] = hashed_password
+        return True
+
     def auxiliary_authenticate(
         self, credentials: AuthCredentials
     ) -> tuple[Literal[True], User] | tuple[Literal[False], str]:
@@ -177,35 +257,38 @@ class UserChain(ChainBase):
             return False, "Invalid authentication credentials"
 
         # Check if the user is disabled
-        useroper = UserOper()
+        user = None
         if credentials.username:
-            user = useroper.get_by_name(name=credentials.username)
+            user = self._useroper.get_by_name(name=credentials.username)
             if user and not user.is_active:
                 logger.info(
-                    f"User {user.name} has been disabled, skip subsequent identity "
-                    f"verification"
+                    "User %s has been disabled, skip subsequent identity verification",
+                    user.name,
                 )
                 return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
 
         logger.debug(
-            f"Authentication type: {credentials.grant_type}, "
-            f"trying to perform auxiliary authentication through the system module, "
-            f"user: {credentials.username}"
+            "Authentication type: %s, trying to perform auxiliary authentication "
+            "through the system module, user: %s",
+            credentials.grant_type,
+            credentials.username,
         )
         result = self.run_module("user_authenticate", credentials=credentials)
 
         if not result:
             logger.debug(
-                f"Auxiliary authentication through the system module failed, "
-                f"trying to trigger the {ChainEventType.AuthVerification} event"
+                "Auxiliary authentication through the system module failed, "
+                "trying to trigger the %s event",
+                ChainEventType.AuthVerification,
             )
             event = self.eventmanager.send_event(
                 etype=ChainEventType.AuthVerification, data=credentials
             )
             if not event or not event.event_data:
                 logger.error(
-                    f"Authentication type: {credentials.grant_type}, "
-                    f"auxiliary authentication failed, no valid data returned"
+                    "Authentication type: %s, "
+                    "auxiliary authentication failed, no valid data returned",
+                    credentials.grant_type,
                 )
                 return (
                     False,
@@ -218,34 +301,37 @@ class UserChain(ChainBase):
             )  # Use the authentication data returned by the event
         else:
             logger.info(
-                f"Auxiliary authentication through the system module was successful, "
-                f"user: {credentials.username}"
+                "Auxiliary authentication through the system module was successful, "
+                "user: %s",
+                credentials.username,
             )
             # Use the authentication data returned by the module authentication
             credentials = result
 
         # Process the logic of successful authentication
-        success = self._process_auth_success(
-            username=credentials.username, credentials=credentials
+        user = self._process_auth_success(
+            username=credentials.username, credentials=credentials, user=user
         )
-        if success:
-            logger.info(f"User {credentials.username} passed auxiliary authentication")
-            return True, useroper.get_by_name(credentials.username)
+        if user:
+            logger.info("User %s passed auxiliary authentication", credentials.username)
+            return True, user
         else:
             logger.warning(
-                f"User {credentials.username} failed auxiliary authentication"
+                "User %s failed auxiliary authentication", credentials.username
             )
             return False, PASSWORD_INVALID_CREDENTIALS_MESSAGE
 
     def _process_auth_success(
-        self, username: str, credentials: AuthCredentials
-    ) -> bool:
+        self, username: str, credentials: AuthCredentials, user: User | None = None
+    ) -> User | None:
         """Process the logic of successful auxiliary authentication, return a user
         object or create a new user.
 
         :param username: Username
         :param credentials: Authentication credentials,
             including token, channel, service and other information
+        :param user: The local user already fetched, it is looked up again if it is
+            missing or does not match the username
         :return:
             - If the authentication is successful and the user exists or has been
               created, return the User object
@@ -253,25 +339,25 @@ class UserChain(ChainBase):
         """
         if not username:
             logger.info(
-                f"Failed to obtain the corresponding user information, "
-                f"{credentials.grant_type} authentication failed"
+                "Failed to obtain the corresponding user information, "
+                "%s authentication failed",
+                credentials.grant_type,
             )
-            return False
+            return None
 
         token, channel, service = (
             credentials.token,
             credentials.channel,
             credentials.service,
         )
-        if not all([token, channel, service]):
+        if not (token and channel and service):
             logger.info(
-                f"User {username} failed the {credentials.grant_type} authentication, "
-                f"necessary information is insufficient"
+                "User %s failed the %s authentication, "
+                "necessary information is insufficient",
+                username,
+                credentials.grant_type,
             )
-            return False
-        assert isinstance(channel, str)
-        assert isinstance(service, str)
-        assert isinstance(token, str)
+            return None
         # Trigger the interception event of successful authentication
         intercept_event = self.eventmanager.send_event(
             etype=ChainEventType.AuthIntercept,
@@ -287,51 +373,60 @@ class UserChain(ChainBase):
             intercept_data: AuthInterceptCredentials = intercept_event.event_data
             if intercept_data.cancel:
                 logger.warning(
-                    f"Authentication was intercepted, "
-                    f"user: {username}, channel: {channel}, "
-                    f"service: {service}, interception source: {intercept_data.source}"
+                    "Authentication was intercepted, "
+                    "user: %s, channel: %s, service: %s, interception source: %s",
+                    username,
+                    channel,
+                    service,
+                    intercept_data.source,
                 )
-                return False
+                return None
 
         # Check if the user exists, if not, and the current authentication is password
         # authentication, create a new user
-        useroper = UserOper()
-        user = useroper.get_by_name(name=username)
+        if not user or user.name != username:
+            user = self._useroper.get_by_name(name=username)
         if user:
             # If the user exists, but has been disabled, respond directly
             if not user.is_active:
                 logger.info(
-                    f"Auxiliary authentication failed, "
-                    f"user {username} has been disabled"
+                    "Auxiliary authentication failed, user %s has been disabled",
+                    username,
                 )
-                return False
-            anonymized_token = f"{token[: len(token) // 2]}********"
+                return None
             logger.info(
-                f"Authentication type: {credentials.grant_type}, user: {username}, "
-                f"channel: {channel}, "
-                f"service: {service} authentication successful, "
-                f"token: {anonymized_token}"
+                "Authentication type: %s, user: %s, channel: %s, "
+                "service: %s authentication successful, token: %s",
+                credentials.grant_type,
+                username,
+                channel,
+                service,
+                _AnonymizedToken(token),
             )
-            return True
+            return user
         else:
             if credentials.grant_type == "password":
-                useroper.add(
+                self._useroper.add(
                     name=username,
                     is_active=True,
                     is_superuser=False,
-                    hashed_password=get_password_hash(secrets.token_urlsafe(16)),
+                    hashed_password=get_unusable_password(),
                 )
                 logger.info(
-                    f"User {username} does not exist, "
-                    f"has passed the {credentials.grant_type} "
-                    f"authentication and has created a normal user"
+                    "User %s does not exist, has passed the %s "
+                    "authentication and has created a normal user",
+                    username,
+                    credentials.grant_type,
                 )
-                return True
+                return self._useroper.get_by_name(name=username)
             else:
                 logger.warning(
-                    f"Authentication type: {credentials.grant_type}, "
-                    f"user: {username}, channel: {channel}, "
-                    f"service: {service} authentication failed, "
-                    f"failed to find the corresponding user information locally"
+                    "Authentication type: %s, user: %s, channel: %s, "
+                    "service: %s authentication failed, "
+                    "failed to find the corresponding user information locally",
+                    credentials.grant_type,
+                    username,
+                    channel,
+                    service,
                 )
-                return False
+                return None
@@ -30,6 +30,29 @@ from app.utils.object import ObjectUtils
 from app.utils.singleton import Singleton
 from app.utils.string import StringUtils
 
+# Marks an attribute the addon class does not define
+_MISSING = object()
+# Addon class attributes copied into the local addon information, (attr, field)
+_ADDON_INFO_ATTRS = (
+    ("addon_public_key", "plugin_public_key"),
+    ("addon_name", "addon_name"),
+    ("addon_desc", "addon_desc"),
+    ("addon_version", "addon_version"),
+    ("addon_icon", "addon_icon"),
+    ("addon_author", "addon_author"),
+    ("author_url", "author_url"),
+    ("addon_order", "addon_order"),
+)
+# Optional methods whose implementation is probed once per running addon
+_ADDON_CAPABILITIES = (
+    "get_api",
+    "get_service",
+    "get_module",
+    "get_dashboard",
+    "get_dashboard_meta",
+    "get_clash_rules",
+)
+
 
 class AddonManager(metaclass=Singleton):
     """AddonManager class to manage addons."""
@@ -39,9 +62,13 @@ class AddonManager(metaclass=Singleton):
         self._addons: dict[str, type[_AddonBase]] = {}
         # running addons list
         self._running_addons: dict[str, _AddonBase] = {}
+        # optional methods implemented by each initialized addon, probed on init
+        self._capabilities: dict[str, frozenset[str]] = {}
         self._config_key: str = f"{SystemConfigKey.AddonConfigPrefix.value}.%s"
         self._hook_chain: HookChain = HookChain()
         self._async_hook_chain: AsyncHookChain = AsyncHookChain()
+        # version of the running addons, bumped when an addon is initialized or stopped
+        self._version: int = 0
 
     def reinit_config(self):
         # stop existing addons
@@ -129,8 +156,31 @@ class AddonManager(metaclass=Singleton):
             self._running_addons.clear()
             # Clear all addon module cache
             self._clear_addon_modules()
+        self._version += 1
         logger.info("Addon stop complete")
 
+    @staticmethod
+    def _probe_capabilities(addon: _AddonBase) -> frozenset[str]:
+        """Finds the optional methods an addon implements.
+
+        :param addon: Addon instance
+        :return: Names of the implemented methods
+        """
+        return frozenset(
+            name
+            for name in _ADDON_CAPABILITIES
+            if (method := getattr(addon, name, None)) is not None
+            and ObjectUtils.check_method(method)
+        )
+
+    def _has_capability(self, addon_id: str, name: str) -> bool:
+        """Checks whether a running addon implements an optional method.
+
+        :param addon_id: Addon ID
+        :param name: Method name, one of _ADDON_CAPABILITIES
+        """
+        return name in self._capabilities.get(addon_id, ())
+
     def init_addon(self, addon_id: str, conf: dict):
         """Initializes the addon.
 
@@ -142,6 +192,8 @@ class AddonManager(metaclass=Singleton):
             return
         # Initialize plugin
         addon.init_addon(conf)
+        # Probe after initializing, the addon may set up its methods there
+        self._capabilities[addon_id] = self._probe_capabilities(addon)
         # Check plugin status and enable/disable event handler
         self.register_addon_hooks(addon_id)
         self.register_addon(addon_id)
@@ -152,6 +204,7 @@ class AddonManager(metaclass=Singleton):
         else:
             # Disable event handler for plugin class
             eventmanager.disable_event_handler(type(addon))
+        self._version += 1
 
     def terminate_addon(self, addon_id: str):
         """Terminate the addon.
@@ -166,6 +219,8 @@ class AddonManager(metaclass=Singleton):
         self.deregister_addon(addon_id)
         self.deregister_addon_hooks(addon_id)
         AddonManager._stop_addon(addon)
+        self._capabilities.pop(addon_id, None)
+        self._version += 1
 
     def register_addon_hooks(self, aid: str):
         addon_obj = self._running_addons.get(aid)
@@ -253,6 +308,10 @@ class AddonManager(metaclass=Singleton):
         """Retrieves all running plugin IDs."""
         return list(self._running_addons.keys())
 
+    def has_running_addons(self) -> bool:
+        """Checks whether any plugin is running."""
+        return bool(self._running_addons)
+
     def get_plugin_apis(self, pid: str | None = None) -> list[AddonApi]:
         """Retrieves plugin APIs."""
         ret_apis: list[AddonApi] = []
@@ -263,7 +322,7 @@ class AddonManager(metaclass=Singleton):
         for plugin_id, plugin in plugins.items():
             if pid and pid != plugin_id:
                 continue
-            if hasattr(plugin, "get_api") and ObjectUtils.check_method(plugin.get_api):
+            if self._has_capability(plugin_id, "get_api"):
                 try:
                     apis = plugin.get_api() or []
                     for api in apis:
@@ -281,9 +340,7 @@ class AddonManager(metaclass=Singleton):
         for addon_id, addon in running_addons_snapshot.items():
             if aid and aid != addon_id:
                 continue
-            if hasattr(addon, "get_service") and ObjectUtils.check_method(
-                addon.get_service
-            ):
+            if self._has_capability(addon_id, "get_service"):
                 try:
                     if not addon.get_state():
                         continue
@@ -307,7 +364,7 @@ class AddonManager(metaclass=Singleton):
         return getattr(plugin, attr)
 
     def get_addon_modules(
-        self, addon_id: str | None = None
+        self, addon_id: str | None = None, check_state: bool = True
     ) -> dict[tuple, dict[str, Any]]:
         """
         Retrieves plugin modules.
@@ -316,6 +373,10 @@ class AddonManager(metaclass=Singleton):
                 method: function
             }
         }
+
+        :param addon_id: Addon ID, all running addons if None
+        :param check_state: Whether to leave out the addons that are disabled now,
+            callers keeping the modules should check the state on each use instead
         """
         ret_modules = {}
         # Create a dictionary snapshot to avoid concurrent modification
@@ -323,11 +384,9 @@ class AddonManager(metaclass=Singleton):
         for aid, addon in running_addons_snapshot.items():
             if addon_id and addon_id != aid:
                 continue
-            if hasattr(addon, "get_module") and ObjectUtils.check_method(
-                addon.get_module
-            ):
+            if self._has_capability(aid, "get_module"):
                 try:
-                    if not addon.get_state():
+                    if check_state and not addon.get_state():
                         continue
                     addon_modules = addon.get_module() or []
                     ret_modules[(aid, addon.addon_name)] = addon_modules
@@ -341,17 +400,13 @@ class AddonManager(metaclass=Singleton):
         # Create a dictionary snapshot to avoid concurrent modification
         running_plugins_snapshot = dict(self._running_addons)
         for plugin_id, plugin in running_plugins_snapshot.items():
-            if not hasattr(plugin, "get_dashboard") or not ObjectUtils.check_method(
-                plugin.get_dashboard
-            ):
+            if not self._has_capability(plugin_id, "get_dashboard"):
                 continue
             try:
                 if not plugin.get_state():
                     continue
                 # If it is a multi-dashboard implementation
-                if hasattr(plugin, "get_dashboard_meta") and ObjectUtils.check_method(
-                    plugin.get_dashboard_meta
-                ):
+                if self._has_capability(plugin_id, "get_dashboard_meta"):
                     meta = plugin.get_dashboard_meta()
                     if meta:
                         dashboard_meta.extend(
@@ -428,9 +483,10 @@ class AddonManager(metaclass=Singleton):
             else:
                 addon.installed = False
             # Running status
-            if addon_obj and hasattr(addon_obj, "get_state"):
+            get_state = getattr(addon_obj, "get_state", None) if addon_obj else None
+            if get_state is not None:
                 try:
-                    state = addon_obj.get_state()
+                    state = get_state()
                 except Exception as e:
                     logger.error(f"Error getting plugin {aid} status: {str(e)}")
                     state = False
@@ -438,35 +494,13 @@ class AddonManager(metaclass=Singleton):
             else:
                 addon.state = False
             # Whether there is a detail page
-            if hasattr(addon_class, "get_page"):
-                if ObjectUtils.check_method(addon_class.get_page):
-                    addon.has_page = True
-                else:
-                    addon.has_page = False
-            # Public key
-            if hasattr(addon_class, "addon_public_key"):
-                addon.plugin_public_key = addon_class.addon_public_key
-            # Name
-            if hasattr(addon_class, "addon_name"):
-                addon.addon_name = addon_class.addon_name
-            # Description
-            if hasattr(addon_class, "addon_desc"):
-                addon.addon_desc = addon_class.addon_desc
-            # Version
-            if hasattr(addon_class, "addon_version"):
-                addon.addon_version = addon_class.addon_version
-            # Icon
-            if hasattr(addon_class, "addon_icon"):
-                addon.addon_icon = addon_class.addon_icon
-            # Author
-            if hasattr(addon_class, "addon_author"):
-                addon.addon_author = addon_class.addon_author
-            # Author link
-            if hasattr(addon_class, "author_url"):
-                addon.author_url = addon_class.author_url
-            # Load order
-            if hasattr(addon_class, "addon_order"):
-                addon.addon_order = addon_class.addon_order
+            get_page = getattr(addon_class, "get_page", None)
+            addon.has_page = get_page is not None and ObjectUtils.check_method(get_page)
+            # Public key, name, description, version, icon, author, load order
+            for attr, field in _ADDON_INFO_ATTRS:
+                value = getattr(addon_class, attr, _MISSING)
+                if value is not _MISSING:
+                    setattr(addon, field, value)
             # Whether update is needed
             addon.has_update = False
             # Local flag
@@ -761,7 +795,7 @@ class AddonManager(metaclass=Singleton):
         rules = []
         running_addons_snapshot = dict(self._running_addons)
         for aid, addon in running_addons_snapshot.items():
-            if ObjectUtils.check_method(addon.get_clash_rules):
+            if self._has_capability(aid, "get_clash_rules"):
                 for rule in addon.get_clash_rules():
                     condition_string = f"{rule},{Action.COMPATIBLE}"
                     parsed = ClashRuleParser.parse_rule_line(condition_string)
@@ -773,6 +807,17 @@ class AddonManager(metaclass=Singleton):
                     rules.append(parsed.condition_string())
         return rules
 
+    @property
+    def version(self) -> int:
+        """Retrieves the version of the running addons.
+
+        It changes whenever an addon is initialized or stopped, so callers can tell
+        when their view of the addons is outdated.
+
+        :return: Version of the running addons
+        """
+        return self._version
+
     @property
     def running_addons(self) -> dict[str, _AddonBase]:
         """Retrieves the list of running plugins.
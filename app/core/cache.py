@@ -1,5 +1,6 @@
 import contextvars
 import inspect
+import os
 import shutil
 import tempfile
 import threading
@@ -1013,6 +1014,31 @@ class AsyncFileBackend(AsyncCacheBackend):
         async with aiofiles.open(cache_path, "rb") as f:
             return await f.read()
 
+    def get_path(
+        self, key: str, region: str = CacheConfig.DEFAULT_CACHE_REGION
+    ) -> Path:
+        """Get the path of the cache file, whether it exists or not.
+
+        :param key: The key of the cache.
+        :param region: The region of the cache.
+        :return: The path of the cache file.
+        """
+        return self.base / region / key
+
+    async def stat(
+        self, key: str, region: str = CacheConfig.DEFAULT_CACHE_REGION
+    ) -> os.stat_result | None:
+        """Get the file status of the cache without reading it.
+
+        :param key: The key of the cache.
+        :param region: The region of the cache.
+        :return: The file status, or None if it does not exist.
+        """
+        try:
+            return await AsyncPath(self.get_path(key, region)).stat()
+        except FileNotFoundError:
+            return None
+
     async def delete(
         self, key: str, region: str = CacheConfig.DEFAULT_CACHE_REGION
     ) -> None:
@@ -9,7 +9,7 @@ from pathlib import Path
 from typing import Any, Literal
 
 from dotenv import set_key
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from app.log import log_settings, logger
@@ -178,6 +178,8 @@ class Settings(BaseSettings, ConfigModel):
         env_file=SystemUtils.get_env_path(),
         env_file_encoding="utf-8",
     )
+    # Dumped settings, excluded fields -> settings dictionary, cleared on updates
+    _snapshots: dict[frozenset[str], dict[str, Any]] = PrivateAttr(default_factory=dict)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -374,6 +376,7 @@ class Settings(BaseSettings, ConfigModel):
                 # Only update memory when configuration is successfully updated
                 if success:
                     setattr(self, key, converted_value)
+                    self._snapshots.clear()
                     if hasattr(log_settings, key):
                         setattr(log_settings, key, converted_value)
                 return success, message
@@ -390,6 +393,16 @@ class Settings(BaseSettings, ConfigModel):
             results[k] = self.update_setting(k, v)
         return results
 
+    def snapshot(self, exclude: frozenset[str] = frozenset()) -> dict[str, Any]:
+        """Dump the settings to a dictionary, cached until the next update.
+
+        :param exclude: Names of the configuration items to leave out
+        :return: The settings dictionary, shared between callers, do not modify it
+        """
+        if (info := self._snapshots.get(exclude)) is None:
+            info = self._snapshots[exclude] = self.model_dump(exclude=set(exclude))
+        return info
+
     @property
     def VERSION_FLAG(self) -> str:
         """Version identifier, used to distinguish major versions.
@@ -22,6 +22,10 @@ class ModuleManager(metaclass=Singleton):
         self._modules: dict = {}
         # Running module list
         self._running_modules: dict = {}
+        # Names of the running modules, resolved once when they are loaded
+        self._running_module_names: dict[str, str] = {}
+        # Version of the running modules, bumped whenever the modules are loaded
+        self._version: int = 0
         self.load_modules()
 
     def load_modules(self):
@@ -33,6 +37,7 @@ class ModuleManager(metaclass=Singleton):
             and hasattr(obj, "init_setting"),
         )
         self._running_modules = {}
+        self._running_module_names = {}
         self._modules = {}
         for module in modules:
             module_id = module.__name__
@@ -45,6 +50,9 @@ class ModuleManager(metaclass=Singleton):
                     # Control loading through module switch
                     _module.init_module()
                     self._running_modules[module_id] = _module
+                    self._running_module_names[module_id] = self.__resolve_name(
+                        module_id, _module
+                    )
                     logger.debug(f"Module Loaded: {module_id}")
             except Exception as err:
                 logger.error(
@@ -52,6 +60,27 @@ class ModuleManager(metaclass=Singleton):
                     f"{str(err)} - {traceback.format_exc()}",
                     exc_info=True,
                 )
+        # Keep the running modules in priority order, so dispatch needs no sorting
+        self._running_modules = dict(
+            sorted(
+                self._running_modules.items(), key=lambda item: item[1].get_priority()
+            )
+        )
+        self._version += 1
+
+    @staticmethod
+    def __resolve_name(module_id: str, module: Any) -> str:
+        """Get the name of a module, falling back to its ID."""
+        try:
+            return module.get_name()
+        except Exception as err:
+            logger.debug(f"Error getting module name: {str(err)}")
+            return module_id
+
+    @property
+    def version(self) -> int:
+        """Version of the running modules, changes whenever the modules are loaded."""
+        return self._version
 
     def stop(self):
         """Stop all modules."""
@@ -114,8 +143,12 @@ class ModuleManager(metaclass=Singleton):
             return None
         return self._running_modules.get(module_id)
 
+    def get_running_module_name(self, module_id: str) -> str:
+        """Get the name of a running module by its ID."""
+        return self._running_module_names.get(module_id, module_id)
+
     def get_running_modules(self, method: str) -> Generator:
-        """Get a list of modules that implement the same method."""
+        """Get a list of modules that implement the same method, in priority order."""
         if not self._running_modules:
             return
         for _, module in self._running_modules.items():
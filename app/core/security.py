@@ -1,4 +1,6 @@
 import datetime
+import secrets
+from functools import cache
 from typing import Annotated, Any
 
 import jwt
@@ -18,12 +20,19 @@ from app.log import logger
 
 ph = PasswordHasher()
 ALGORITHM = "HS256"
+# Prefix of stored passwords that no password can verify against
+UNUSABLE_PASSWORD_PREFIX = "!"
 
 # OAuth2PasswordBearer for JWT Token authentication
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
+# Optional OAuth2PasswordBearer, for endpoints that also accept other credentials
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token", auto_error=False
+)
+
 # API KEY authentication via Header
 api_key_header = APIKeyHeader(
     name="X-API-KEY", auto_error=False, scheme_name="api_key_header"
@@ -258,10 +267,20 @@ def verify_token(
     return payload
 
 
+@cache
+def __dummy_password_hash() -> str:
+    """Hash of a random password, verified against instead of unusable passwords."""
+    return ph.hash(secrets.token_urlsafe(32))
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    unusable = hashed_password.startswith(UNUSABLE_PASSWORD_PREFIX)
+    if unusable:
+        # Take as long as a real check would, but never match
+        hashed_password = __dummy_password_hash()
     try:
         ph.verify(hashed_password, plain_password)
-        return True
+        return not unusable
     except VerifyMismatchError:
         return False
 
@@ -284,6 +303,26 @@ def verify_apitoken(token: Annotated[str, Security(__get_api_token)]) -> str:
     return __verify_key(token, settings.API_TOKEN, "token")
 
 
+def verify_token_or_apitoken(
+    request: Request,
+    response: Response,
+    token: Annotated[str | None, Security(optional_oauth2_scheme)] = None,
+    apitoken: Annotated[str | None, Security(__get_api_token)] = None,
+) -> schemas.TokenPayload | str:
+    """Authenticates using either an API Token or a JWT token.
+
+    :param request: The request object, used to access cookies and request information
+    :param response: The response object, used to set cookies
+    :param token: The JWT token from the Authorization header
+    :param apitoken: The API Token, obtained from the URL query parameter token=xxx
+    :return: The validated API Token, or the parsed TokenPayload
+    :raises HTTPException: If neither credential is valid
+    """
+    if apitoken:
+        return __verify_key(apitoken, settings.API_TOKEN, "token")
+    return verify_token(request, response, token)
+
+
 def verify_resource_token(
     resource_token: Annotated[str, Security(resource_token_cookie)],
 ) -> schemas.TokenPayload:
@@ -299,3 +338,11 @@ def verify_resource_token(
 
 def get_password_hash(password: str) -> str:
     return ph.hash(password)
+
+
+def get_unusable_password() -> str:
+    """Returns a stored password that no password verifies against, without hashing.
+
+    :return: The unusable password
+    """
+    return f"{UNUSABLE_PASSWORD_PREFIX}{secrets.token_urlsafe(16)}"
@@ -20,6 +20,15 @@ class AddonDataOper(DbOper):
         else:
             AddonData(addon_id=plugin_id, key=key, value=value).create(self._db)  # noqa
 
+    def save_many(self, items: list[tuple[str, str, Any]]):
+        """Save several addon data items in a single transaction.
+
+        :param items: List of (addon ID, data key, data value)
+        """
+        if not items:
+            return
+        AddonData.save_addon_data_many(self._db, items)  # noqa
+
     def get_data(self, plugin_id: str, key: str | None = None) -> Any:
         """Get addon data.
 
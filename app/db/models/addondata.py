@@ -1,3 +1,5 @@
+from typing import Any
+
 from sqlalchemy import JSON, Column, String
 from sqlalchemy.orm import Session
 
@@ -24,6 +26,29 @@ class AddonData(Base):
     def get_addon_data_by_key(cls, db: Session, addon_id: str, key: str):
         return db.query(cls).filter(cls.addon_id == addon_id, cls.key == key).first()
 
+    @classmethod
+    @db_update
+    def save_addon_data_many(cls, db: Session, items: list[tuple[str, str, Any]]):
+        existing = {
+            (data.addon_id, data.key): data
+            for data in db.query(cls)
+            .filter(
+                cls.addon_id.in_({addon_id for addon_id, _, _ in items}),
+                cls.key.in_({key for _, key, _ in items}),
+            )
+            .all()
+        }
+        for addon_id, key, value in items:
+            data = existing.get((addon_id, key))
+            if data:
+                data.value = value
+            else:
+                # Remember the new row, a repeated key in the batch updates it
+                data = existing[(addon_id, key)] = cls(
+                    addon_id=addon_id, key=key, value=value
+                )
+                db.add(data)
+
     @classmethod
     @db_update
     def del_addon_data_by_key(cls, db: Session, addon_id: str, key: str):
@@ -20,7 +20,7 @@ class User(Base):
     # ID
     id = get_id_column()
     # Username, unique value
-    name = Column(String, index=True, nullable=False)
+    name = Column(String, index=True, unique=True, nullable=False)
     # Email
     email = Column(String)
     # Hashed password
@@ -51,6 +51,27 @@ class User(Base):
         result = await db.execute(select(cls).filter(cls.name == name))
         return result.scalars().first()
 
+    @classmethod
+    @db_query
+    def get_by_names(cls, db: Session, names: list[str]):
+        return db.query(cls).filter(cls.name.in_(names)).all()
+
+    @classmethod
+    @async_db_query
+    async def async_get_by_names(cls, db: AsyncSession, names: list[str]):
+        result = await db.execute(select(cls).filter(cls.name.in_(names)))
+        return result.scalars().all()
+
+    @classmethod
+    @async_db_query
+    async def async_get_by_name_excluding_id(
+        cls, db: AsyncSession, name: str, exclude_id: int
+    ):
+        result = await db.execute(
+            select(cls.id).where(cls.name == name, cls.id != exclude_id).limit(1)
+        )
+        return result.scalar()
+
     @classmethod
     @db_query
     def get_by_id(cls, db: Session, user_id: int):
@@ -1,7 +1,8 @@
-from sqlalchemy import JSON, Column, Index, String, UniqueConstraint
+from sqlalchemy import JSON, Column, Index, String, UniqueConstraint, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import Base, db_query, db_update, get_id_column
+from app.db import Base, async_db_query, db_query, db_update, get_id_column
 
 
 class UserConfig(Base):
@@ -33,6 +34,14 @@ class UserConfig(Base):
             .first()
         )
 
+    @classmethod
+    @async_db_query
+    async def async_get_by_key(cls, db: AsyncSession, username: str, key: str):
+        result = await db.execute(
+            select(cls).where(cls.username == username, cls.key == key)
+        )
+        return result.scalar_one_or_none()
+
     @db_update
     def delete_by_key(self, db: Session, username: str, key: str):
         userconfig = self.get_by_key(db=db, username=username, key=key)
@@ -102,6 +102,12 @@ class UserOper(DbOper):
         """
         return User.get_by_name(self._db, name)  # noqa
 
+    async def async_get_by_name(self, name: str) -> User:
+        """
+        Asynchronously get a user by name.
+        """
+        return await User.async_get_by_name(self._db, name)  # noqa
+
     def get_permissions(self, name: str) -> dict:
         """
         Get user permissions.
@@ -120,6 +126,26 @@ class UserOper(DbOper):
             return user.settings or {}
         return None
 
+    def get_settings_by_names(self, names: list[str]) -> dict[str, dict]:
+        """
+        Get personalized settings of several users at once, by username.
+        Users that do not exist are left out.
+        """
+        if not names:
+            return {}
+        users = User.get_by_names(self._db, names)  # noqa
+        return {user.name: user.settings or {} for user in users}
+
+    async def async_get_settings_by_names(self, names: list[str]) -> dict[str, dict]:
+        """
+        Asynchronously get personalized settings of several users at once, by
+        username. Users that do not exist are left out.
+        """
+        if not names:
+            return {}
+        users = await User.async_get_by_names(self._db, names)  # noqa
+        return {user.name: user.settings or {} for user in users}
+
     def get_setting(self, name: str, key: str) -> str | None:
         """
         Get a user's personalized setting.
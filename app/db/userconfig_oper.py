@@ -41,6 +41,27 @@ class UserConfigOper(DbOper, metaclass=Singleton):
             conf = UserConfig(username=username, key=key, value=value)
             conf.create(self._db)  # noqa
 
+    async def async_set(self, username: str, key: str | UserConfigKey, value: Any):
+        """
+        异步设置用户配置
+        """
+        if isinstance(key, UserConfigKey):
+            key = key.value
+        # 更新内存
+        self.__set_config_cache(username=username, key=key, value=value)
+        # 写入数据库
+        conf = await UserConfig.async_get_by_key(  # noqa
+            self._db, username=username, key=key
+        )
+        if conf:
+            if value:
+                await conf.async_update(self._db, {"value": value})
+            else:
+                await UserConfig.async_delete(self._db, conf.id)
+        else:
+            conf = UserConfig(username=username, key=key, value=value)
+            await conf.async_create(self._db)  # noqa
+
     def get(self, username: str, key: str | UserConfigKey = None) -> Any:
         """
         获取用户配置
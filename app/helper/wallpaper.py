@@ -1,6 +1,6 @@
 from app.core.cache import cached
 from app.core.config import settings
-from app.utils.http import RequestUtils
+from app.utils.http import AsyncRequestUtils
 from app.utils.singleton import Singleton
 
 
@@ -9,33 +9,72 @@ class WallpaperHelper(metaclass=Singleton):
     壁纸帮助类
     """
 
-    def get_wallpaper(self) -> str | None:
+    async def async_get_wallpaper(self) -> str | None:
         """
-        获取登录页面壁纸
+        异步获取登录页面壁纸
         """
         if settings.WALLPAPER == "bing":
-            return self.get_bing_wallpaper()
+            return await self.async_get_bing_wallpaper()
         elif settings.WALLPAPER == "customize":
-            return self.get_customize_wallpaper()
+            return await self.async_get_customize_wallpaper()
         return ""
 
-    def get_wallpapers(self, num: int = 10) -> list[str]:
+    async def async_get_wallpapers(self, num: int = 10) -> list[str]:
         """
-        获取登录页面壁纸列表
+        异步获取登录页面壁纸列表
         """
         if settings.WALLPAPER == "bing":
-            return self.get_bing_wallpapers(num)
+            return await self.async_get_bing_wallpapers(num)
         elif settings.WALLPAPER == "customize":
-            return self.get_customize_wallpapers()
+            return await self.async_get_customize_wallpapers()
         return []
 
     @cached(maxsize=1, ttl=3600)
-    def get_bing_wallpaper(self) -> str | None:
+    async def async_get_bing_wallpaper(self) -> str | None:
         """
-        获取Bing每日壁纸
+        异步获取Bing每日壁纸
         """
         url = "https://cn.bing.com/HPImageArchive.aspx?format=js&idx=0&n=1"
-        resp = RequestUtils(timeout=5).get_res(url)
+        resp = await AsyncRequestUtils(timeout=5).get_res(url)
+        return self.__parse_bing_wallpaper(resp)
+
+    @cached(maxsize=1, ttl=3600, skip_empty=True)
+    async def async_get_bing_wallpapers(self, num: int = 7) -> list[str]:
+        """
+        异步获取7天的Bing每日壁纸
+        """
+        url = f"https://cn.bing.com/HPImageArchive.aspx?format=js&idx=0&n={num}"
+        resp = await AsyncRequestUtils(timeout=5).get_res(url)
+        return self.__parse_bing_wallpapers(resp)
+
+    @cached(maxsize=1, ttl=3600)
+    async def async_get_customize_wallpaper(self) -> str | None:
+        """
+        异步获取自定义壁纸api壁纸
+        """
+        wallpaper_list = await self.async_get_customize_wallpapers()
+        if wallpaper_list:
+            return wallpaper_list[0]
+        return None
+
+    @cached(maxsize=1, ttl=3600, skip_empty=True)
+    async def async_get_customize_wallpapers(self) -> list[str]:
+        """
+        异步获取自定义壁纸api壁纸
+        """
+        # 判断是否存在自定义壁纸api
+        if not settings.CUSTOMIZE_WALLPAPER_API_URL:
+            return []
+        resp = await AsyncRequestUtils(timeout=15).get_res(
+            settings.CUSTOMIZE_WALLPAPER_API_URL
+        )
+        return self.__parse_customize_wallpapers(resp)
+
+    @staticmethod
+    def __parse_bing_wallpaper(resp) -> str | None:
+        """
+        解析Bing每日壁纸
+        """
         if resp and resp.status_code == 200:
             try:
                 result = resp.json()
@@ -50,13 +89,11 @@ class WallpaperHelper(metaclass=Singleton):
                 print(str(err))
         return None
 
-    @cached(maxsize=1, ttl=3600, skip_empty=True)
-    def get_bing_wallpapers(self, num: int = 7) -> list[str]:
+    @staticmethod
+    def __parse_bing_wallpapers(resp) -> list[str]:
         """
-        获取7天的Bing每日壁纸
+        解析Bing每日壁纸列表
         """
-        url = f"https://cn.bing.com/HPImageArchive.aspx?format=js&idx=0&n={num}"
-        resp = RequestUtils(timeout=5).get_res(url)
         if resp and resp.status_code == 200:
             try:
                 result = resp.json()
@@ -69,20 +106,10 @@ class WallpaperHelper(metaclass=Singleton):
                 print(str(err))
         return []
 
-    @cached(maxsize=1, ttl=3600)
-    def get_customize_wallpaper(self) -> str | None:
+    @staticmethod
+    def __parse_customize_wallpapers(resp) -> list[str]:
         """
-        获取自定义壁纸api壁纸
-        """
-        wallpaper_list = self.get_customize_wallpapers()
-        if wallpaper_list:
-            return wallpaper_list[0]
-        return None
-
-    @cached(maxsize=1, ttl=3600, skip_empty=True)
-    def get_customize_wallpapers(self) -> list[str]:
-        """
-        获取自定义壁纸api壁纸
+        解析自定义壁纸api返回的壁纸列表
         """
 
         def find_files_with_suffixes(obj, suffixes: list[str]) -> list[str]:
@@ -109,30 +136,23 @@ class WallpaperHelper(metaclass=Singleton):
 
             return _result
 
-        # 判断是否存在自定义壁纸api
-        if settings.CUSTOMIZE_WALLPAPER_API_URL:
-            wallpaper_list = []
-            resp = RequestUtils(timeout=15).get_res(
-                settings.CUSTOMIZE_WALLPAPER_API_URL
-            )
-            if resp and resp.status_code == 200:
-                # 如果返回的是图片格式
-                content_type = resp.headers.get("Content-Type")
-                if content_type and content_type.lower().startswith("image/"):
-                    wallpaper_list.append(settings.CUSTOMIZE_WALLPAPER_API_URL)
-                else:
-                    try:
-                        result = resp.json()
-                        if (
-                            isinstance(result, list)
-                            or isinstance(result, dict)
-                            or isinstance(result, str)
-                        ):
-                            wallpaper_list = find_files_with_suffixes(
-                                result, settings.SECURITY_IMAGE_SUFFIXES
-                            )
-                    except Exception as err:
-                        print(str(err))
-            return wallpaper_list
-        else:
-            return []
+        wallpaper_list = []
+        if resp and resp.status_code == 200:
+            # 如果返回的是图片格式
+            content_type = resp.headers.get("Content-Type")
+            if content_type and content_type.lower().startswith("image/"):
+                wallpaper_list.append(settings.CUSTOMIZE_WALLPAPER_API_URL)
+            else:
+                try:
+                    result = resp.json()
+                    if (
+                        isinstance(result, list)
+                        or isinstance(result, dict)
+                        or isinstance(result, str)
+                    ):
+                        wallpaper_list = find_files_with_suffixes(
+                            result, settings.SECURITY_IMAGE_SUFFIXES
+                        )
+                except Exception as err:
+                    print(str(err))
+        return wallpaper_list
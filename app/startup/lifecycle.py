@@ -5,8 +5,9 @@ from fastapi import FastAPI
 from app.startup.addons_initializer import init_addons, stop_addons
 from app.startup.master_initializer import init_master, stop_master
 from app.startup.modules_initializer import init_modules, stop_modules
-from app.startup.routers_initializer import init_routers
+from app.startup.routers_initializer import init_addon_routers, init_routers
 from app.startup.scheduler_initializer import init_scheduler, stop_scheduler
+from app.utils.http import AsyncRequestUtils
 
 
 async def init_extra():
@@ -26,6 +27,8 @@ async def lifespan(app: FastAPI):
     await init_master()
     # Initialize addons
     init_addons()
+    # Register addon APIs
+    await init_addon_routers()
     # Initialize scheduler
     init_scheduler()
 
@@ -43,3 +46,5 @@ async def lifespan(app: FastAPI):
         await stop_master()
         # Stop modules
         stop_modules()
+        # Close pooled HTTP clients
+        await AsyncRequestUtils.close_shared_clients()
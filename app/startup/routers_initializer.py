@@ -11,3 +11,12 @@ def init_routers(app: FastAPI):
 
     # API router
     app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+async def init_addon_routers():
+    """
+    Registers the APIs of the running addons.
+    """
+    from app.api.endpoints.addon import async_batch_register
+
+    await async_batch_register()
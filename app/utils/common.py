@@ -1,5 +1,6 @@
 import inspect
 import time
+from collections.abc import Callable
 from typing import Any
 
 from app.schemas import ImmediateException
@@ -64,3 +65,17 @@ def retry(
             return f_retry
 
     return deco_retry
+
+
+def sync_safe(func: Callable) -> Callable:
+    """Mark a synchronous addon module function as safe to call on the event loop.
+
+    Asynchronous chains run synchronous addon functions in a thread pool by default.
+    Functions with this mark are called directly instead, so only mark functions
+    that never block and return within about a millisecond.
+
+    :param func: The synchronous function
+    :return: The same function
+    """
+    func.__sync_safe__ = True
+    return func
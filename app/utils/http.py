@@ -1,7 +1,10 @@
+import asyncio
 import sys
 from contextlib import asynccontextmanager, contextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from pathlib import Path
 from typing import Any
+from weakref import WeakKeyDictionary
 
 import httpx
 import requests
@@ -493,6 +496,12 @@ class AsyncRequestUtils:
     """Asynchronous HTTP request utility class, providing basic asynchronous HTTP
     request functions."""
 
+    # Pooled clients shared by requests without a client, one set per event loop,
+    # event loop -> (proxy, timeout) -> client
+    _shared_clients: WeakKeyDictionary[
+        asyncio.AbstractEventLoop, dict[tuple[str | None, int], httpx.AsyncClient]
+    ] = WeakKeyDictionary()
+
     def __init__(
         self,
         headers: dict | None = None,
@@ -510,7 +519,7 @@ class AsyncRequestUtils:
         :param ua: User-Agent string
         :param cookies: Cookie string or dictionary
         :param proxies: Proxy settings
-        :param client: httpx.AsyncClient instance, if None, a new client will be created
+        :param client: httpx.AsyncClient instance, if None, a shared pooled client is used
         :param timeout: Request timeout in seconds, defaults to 20 seconds
         :param referer: Referer header information
         :param content_type: Request Content-Type, defaults to "application/x-www-form-urlencoded; charset=UTF-8"
@@ -603,21 +612,32 @@ class AsyncRequestUtils:
         :return: HTTP response object
         :raises: httpx.RequestError only if raise_exception is True
         """
-        if self._client is None:
-            # Create a temporary client
-            async with httpx.AsyncClient(
+        client = self._client or self._get_shared_client()
+        return await self._make_request(client, method, url, raise_exception, **kwargs)
+
+    def _get_shared_client(self) -> httpx.AsyncClient:
+        """Get the pooled client for the proxy and timeout of this instance, reusing
+        its connections across requests of the running event loop."""
+        clients = self._shared_clients.setdefault(asyncio.get_running_loop(), {})
+        key = (self._proxies, self._timeout)
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            client = clients[key] = httpx.AsyncClient(
                 proxy=self._proxies,
                 timeout=self._timeout,
                 verify=False,
                 follow_redirects=True,
-            ) as client:
-                return await self._make_request(
-                    client, method, url, raise_exception, **kwargs
-                )
-        else:
-            return await self._make_request(
-                self._client, method, url, raise_exception, **kwargs
+                # Do not keep response cookies, the client is shared by all callers
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
             )
+        return client
+
+    @classmethod
+    async def close_shared_clients(cls):
+        """Close the pooled clients of the running event loop."""
+        clients = cls._shared_clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
 
     async def _make_request(
         self,
@@ -111,23 +111,37 @@ class ObjectUtils:
     @staticmethod
     def check_signature(func: FunctionType, *args) -> bool:
         """Checks if the output matches the function's argument types."""
+        # One type is returned per parameter, so the signature is only read once
+        param_types = ObjectUtils.get_param_types(func)
+        if len(args) != len(param_types):
+            return False
+        for arg, param_type in zip(args, param_types, strict=False):
+            if param_type is None:
+                continue
+            if not isinstance(arg, param_type):
+                return False
+        return True
+
+    @staticmethod
+    def get_param_types(func: FunctionType) -> list[Any]:
+        """Gets the type of each function argument, None if it is not annotated."""
         # Get function parameter information
         signature = inspect.signature(func)
         parameters = signature.parameters
-        if len(args) != len(parameters):
-            return False
         try:
             # 获取解析后的类型提示
             type_hints = get_type_hints(func)
         except TypeError:
             type_hints = {}
-        for arg, (param_name, param) in zip(args, parameters.items(), strict=False):
+        param_types = []
+        for param_name, param in parameters.items():
             # Prefer parsed type hints
             param_type = type_hints.get(param_name, None)
             if param_type is None:
                 # Handle raw annotations (possibly string or Cython types)
                 param_annotation = param.annotation
                 if param_annotation is inspect.Parameter.empty:
+                    param_types.append(None)
                     continue
                 # Handle string type annotations
                 if isinstance(param_annotation, str):
@@ -138,11 +152,9 @@ class ObjectUtils:
                         param_type = eval(param_annotation, global_vars)
                     except Exception as err:
                         print(str(err))
+                        param_types.append(None)
                         continue
                 else:
                     param_type = param_annotation
-            if param_type is None:
-                continue
-            if not isinstance(arg, param_type):
-                return False
-        return True
+            param_types.append(param_type)
+        return param_types
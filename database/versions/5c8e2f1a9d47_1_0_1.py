@@ -0,0 +1,44 @@
+"""1.0.1
+
+Revision ID: 5c8e2f1a9d47
+Revises: 294b007932ef
+Create Date: 2026-10-17 10:12:05.318204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.log import logger
+
+# revision identifiers, used by Alembic.
+revision = "5c8e2f1a9d47"
+down_revision = "294b007932ef"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Make the username index unique.
+    """
+    conn = op.get_bind()
+    indexes = {index["name"]: index for index in sa.inspect(conn).get_indexes("user")}
+    if indexes.get("ix_user_name", {}).get("unique"):
+        return
+    duplicated = conn.execute(
+        sa.text('SELECT name FROM "user" GROUP BY name HAVING COUNT(*) > 1')
+    ).first()
+    if duplicated:
+        logger.warning(
+            f"Duplicate username {duplicated[0]} found, skip creating the unique index"
+        )
+        return
+    if "ix_user_name" in indexes:
+        op.drop_index("ix_user_name", table_name="user")
+    op.create_index("ix_user_name", "user", ["name"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_name", table_name="user")
+    op.create_index("ix_user_name", "user", ["name"], unique=False)
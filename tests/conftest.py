@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# Keep the tests away from the configuration and database of a real installation
+os.environ.setdefault("CONFIG_DIR", tempfile.mkdtemp(prefix="mitmpilot-test-"))
+
+import app.db.models  # noqa: E402, F401
+import app.db.models.message  # noqa: E402, F401
+from app.db.init import init_db  # noqa: E402
+
+init_db()
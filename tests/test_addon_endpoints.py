@@ -0,0 +1,241 @@
+import pytest
+
+from app import schemas
+from app.api.endpoints import addon as addon_endpoints
+from app.core.ctx import Context
+
+
+class FakeAddonManager:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def async_get_online_addons(self, force: bool = False):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def online_cache(monkeypatch):
+    monkeypatch.setattr(
+        addon_endpoints,
+        "_online_cache",
+        {"data": None, "ts": 0.0, "retry_ts": 0.0, "task": None},
+    )
+    return addon_endpoints._online_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class Clock:
+        now = 1000.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(addon_endpoints.time, "monotonic", clock)
+    return clock
+
+
+def _use_manager(monkeypatch, *results) -> FakeAddonManager:
+    manager = FakeAddonManager(*results)
+    monkeypatch.setattr(Context, "addonmanager", manager, raising=False)
+    return manager
+
+
+async def _finish_refresh(online_cache):
+    if online_cache["task"] is not None:
+        await online_cache["task"]
+
+
+class TestOnlineAddonCache:
+    @pytest.mark.anyio
+    async def test_first_request_blocks_on_fetch(
+        self, monkeypatch, online_cache, clock
+    ):
+        manager = _use_manager(monkeypatch, ["a"])
+        assert await addon_endpoints._get_online_cached() == ["a"]
+        assert manager.calls == 1
+
+    @pytest.mark.anyio
+    async def test_fresh_list_is_served_from_cache(
+        self, monkeypatch, online_cache, clock
+    ):
+        manager = _use_manager(monkeypatch, ["a"], ["b"])
+        await addon_endpoints._get_online_cached()
+        clock.now += addon_endpoints._ONLINE_CACHE_TTL - 1
+        assert await addon_endpoints._get_online_cached() == ["a"]
+        assert manager.calls == 1
+
+    @pytest.mark.anyio
+    async def test_stale_list_is_served_while_refreshing(
+        self, monkeypatch, online_cache, clock
+    ):
+        manager = _use_manager(monkeypatch, ["a"], ["b"])
+        await addon_endpoints._get_online_cached()
+        clock.now += addon_endpoints._ONLINE_CACHE_TTL
+        assert await addon_endpoints._get_online_cached() == ["a"]
+        await _finish_refresh(online_cache)
+        assert manager.calls == 2
+        assert await addon_endpoints._get_online_cached() == ["b"]
+
+    @pytest.mark.anyio
+    async def test_force_blocks_on_fetch(self, monkeypatch, online_cache, clock):
+        manager = _use_manager(monkeypatch, ["a"], ["b"])
+        await addon_endpoints._get_online_cached()
+        assert await addon_endpoints._get_online_cached(force=True) == ["b"]
+        assert manager.calls == 2
+
+    @pytest.mark.anyio
+    async def test_failed_refresh_keeps_stale_list_and_backs_off(
+        self, monkeypatch, online_cache, clock
+    ):
+        manager = _use_manager(monkeypatch, ["a"], RuntimeError("down"), [], ["b"])
+        await addon_endpoints._get_online_cached()
+        clock.now += addon_endpoints._ONLINE_CACHE_TTL
+        # The remote raises, the stale list is kept
+        assert await addon_endpoints._get_online_cached() == ["a"]
+        await _finish_refresh(online_cache)
+        assert manager.calls == 2
+        # No new refresh is started within the retry interval
+        clock.now += addon_endpoints._ONLINE_RETRY_INTERVAL - 1
+        assert await addon_endpoints._get_online_cached() == ["a"]
+        await _finish_refresh(online_cache)
+        assert manager.calls == 2
+        # The remote returns nothing, the stale list is kept again
+        clock.now += 1
+        assert await addon_endpoints._get_online_cached() == ["a"]
+        await _finish_refresh(online_cache)
+        assert manager.calls == 3
+        clock.now += addon_endpoints._ONLINE_RETRY_INTERVAL - 1
+        await addon_endpoints._get_online_cached()
+        assert manager.calls == 3
+        clock.now += 1
+        await addon_endpoints._get_online_cached()
+        await _finish_refresh(online_cache)
+        assert manager.calls == 4
+        assert await addon_endpoints._get_online_cached() == ["b"]
+
+    @pytest.mark.anyio
+    async def test_invalidate_clears_backoff(self, monkeypatch, online_cache, clock):
+        manager = _use_manager(monkeypatch, ["a"], RuntimeError("down"), ["b"])
+        await addon_endpoints._get_online_cached()
+        clock.now += addon_endpoints._ONLINE_CACHE_TTL
+        await addon_endpoints._get_online_cached()
+        await _finish_refresh(online_cache)
+        addon_endpoints._invalidate_online_cache()
+        assert await addon_endpoints._get_online_cached() == ["b"]
+        assert manager.calls == 3
+
+
+class FakeApiAddonManager:
+    def __init__(self, apis: dict[str, list[str]]):
+        self.apis = apis
+        self.reloaded = []
+
+    def get_running_plugin_ids(self) -> list[str]:
+        return list(self.apis)
+
+    def get_plugin_apis(self, pid: str) -> list[schemas.AddonApi]:
+        return [
+            schemas.AddonApi(path=f"/{pid}{path}", endpoint=lambda: None)
+            for path in self.apis.get(pid, [])
+        ]
+
+    def reload_addon(self, addon_id: str):
+        self.reloaded.append(addon_id)
+
+
+@pytest.fixture
+def routes(monkeypatch):
+    app = addon_endpoints.app
+    monkeypatch.setattr(app.router, "routes", list(app.router.routes))
+    monkeypatch.setattr(addon_endpoints, "_plugin_routes", {})
+    setups = []
+    monkeypatch.setattr(app, "setup", lambda: setups.append(True))
+    return setups
+
+
+def _plugin_paths() -> set[str]:
+    return {
+        route.path
+        for route in addon_endpoints.app.routes
+        if route.path.startswith(addon_endpoints.PLUGIN_PREFIX)
+    }
+
+
+class TestAddonRoutes:
+    @pytest.mark.anyio
+    async def test_running_addons_are_registered_with_one_setup(
+        self, monkeypatch, routes
+    ):
+        monkeypatch.setattr(
+            Context,
+            "addonmanager",
+            FakeApiAddonManager({"one": ["/a"], "two": ["/b", "/c"]}),
+            raising=False,
+        )
+        await addon_endpoints.async_batch_register()
+        prefix = addon_endpoints.PLUGIN_PREFIX
+        assert _plugin_paths() == {
+            f"{prefix}/one/a",
+            f"{prefix}/two/b",
+            f"{prefix}/two/c",
+        }
+        assert len(routes) == 1
+
+    @pytest.mark.anyio
+    async def test_reload_replaces_addon_routes(self, monkeypatch, routes):
+        manager = FakeApiAddonManager({"one": ["/a"], "two": ["/b"]})
+        monkeypatch.setattr(Context, "addonmanager", manager, raising=False)
+        await addon_endpoints.async_batch_register()
+        manager.apis["one"] = ["/new"]
+        await addon_endpoints.reload_plugin("one")
+        prefix = addon_endpoints.PLUGIN_PREFIX
+        assert manager.reloaded == ["one"]
+        assert _plugin_paths() == {f"{prefix}/one/new", f"{prefix}/two/b"}
+        assert len(routes) == 2
+
+    @pytest.mark.anyio
+    async def test_unchanged_batch_does_not_rebuild_routing(self, monkeypatch, routes):
+        monkeypatch.setattr(
+            Context, "addonmanager", FakeApiAddonManager({"one": []}), raising=False
+        )
+        await addon_endpoints.async_batch_register()
+        assert routes == []
+
+
+@pytest.fixture
+def addon_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        type(addon_endpoints.settings), "ROOT_PATH", property(lambda _: tmp_path)
+    )
+    addon_dir = tmp_path / "app" / "addons" / "demo"
+    addon_dir.mkdir(parents=True)
+    (addon_dir / "index.js").write_text("export {}")
+    (addon_dir / "dist").mkdir()
+    return addon_dir
+
+
+class TestPluginStaticFile:
+    @pytest.mark.anyio
+    async def test_existing_file_is_served(self, addon_dir):
+        response = await addon_endpoints.plugin_static_file("demo", "index.js")
+        assert response.status_code == 200
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("filepath", ["missing.js", "index.js/x"])
+    async def test_unreachable_file_is_not_found(self, addon_dir, filepath):
+        with pytest.raises(addon_endpoints.HTTPException) as e:
+            await addon_endpoints.plugin_static_file("demo", filepath)
+        assert e.value.status_code == 404
+
+    @pytest.mark.anyio
+    async def test_directory_is_forbidden(self, addon_dir):
+        with pytest.raises(addon_endpoints.HTTPException) as e:
+            await addon_endpoints.plugin_static_file("demo", "dist")
+        assert e.value.status_code == 403
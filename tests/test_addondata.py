@@ -0,0 +1,43 @@
+from app.db.addondata_oper import AddonDataOper
+
+
+class TestAddonDataOper:
+    def setup_method(self):
+        self.oper = AddonDataOper()
+        self.oper.truncate()
+
+    def test_save_many_inserts_and_updates(self):
+        self.oper.save("first", "kept", 1)
+        self.oper.save("first", "updated", 1)
+        self.oper.save_many(
+            [
+                ("first", "updated", {"value": 2}),
+                ("first", "inserted", [3]),
+                ("second", "updated", 4),
+            ]
+        )
+        assert self.oper.get_data("first", "kept") == 1
+        assert self.oper.get_data("first", "updated") == {"value": 2}
+        assert self.oper.get_data("first", "inserted") == [3]
+        assert self.oper.get_data("second", "updated") == 4
+        assert len(self.oper.get_data_all("first")) == 3
+        assert len(self.oper.get_data_all("second")) == 1
+
+    def test_save_many_keeps_the_last_value_of_a_repeated_key(self):
+        self.oper.save("existing", "key", 0)
+        self.oper.save_many(
+            [
+                ("new", "key", 1),
+                ("existing", "key", 1),
+                ("new", "key", 2),
+                ("existing", "key", 2),
+            ]
+        )
+        assert self.oper.get_data("new", "key") == 2
+        assert self.oper.get_data("existing", "key") == 2
+        assert len(self.oper.get_data_all("new")) == 1
+        assert len(self.oper.get_data_all("existing")) == 1
+
+    def test_save_many_without_items(self):
+        self.oper.save_many([])
+        assert self.oper.get_data_all("first") == []
@@ -0,0 +1,158 @@
+import pytest
+
+from app.chain import ChainBase
+from app.core.ctx import Context
+
+
+class FakeAddon:
+    def __init__(self, addon_id: str, modules: dict, enabled: bool = True):
+        self.addon_id = addon_id
+        self.addon_name = addon_id.title()
+        self.modules = modules
+        self.enabled = enabled
+
+    def get_state(self) -> bool:
+        return self.enabled
+
+    def get_module(self) -> dict:
+        return self.modules
+
+
+class FakeAddonManager:
+    def __init__(self, *addons: FakeAddon):
+        self.running_addons = {addon.addon_id: addon for addon in addons}
+        self.version = 1
+
+    def has_running_addons(self) -> bool:
+        return bool(self.running_addons)
+
+    def get_addon_modules(
+        self, addon_id: str | None = None, check_state: bool = True
+    ) -> dict[tuple[str, str], dict]:
+        return {
+            (aid, addon.addon_name): addon.get_module()
+            for aid, addon in self.running_addons.items()
+            if (not addon_id or addon_id == aid)
+            and (not check_state or addon.get_state())
+        }
+
+
+class FakeModuleManager:
+    def __init__(self, *modules):
+        self.modules = list(modules)
+        self.version = 1
+
+    def get_running_modules(self, method: str):
+        return [module for module in self.modules if hasattr(module, method)]
+
+    @staticmethod
+    def get_running_module_name(module_id: str) -> str:
+        return module_id
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    monkeypatch.setattr(ChainBase, "_addon_method_index", (-1, {}))
+    monkeypatch.setattr(ChainBase, "_module_method_index", (-1, {}))
+    monkeypatch.setattr(Context, "addonmanager", FakeAddonManager(), raising=False)
+    monkeypatch.setattr(Context, "modulemanager", FakeModuleManager(), raising=False)
+    return ChainBase()
+
+
+def _empty_tuple() -> tuple[str | None, str | None]:
+    return None, None
+
+
+class TestRunModule:
+    def test_empty_tuple_result_continues_to_next_addon(self, chain, monkeypatch):
+        def second() -> str | None:
+            return "second"
+
+        monkeypatch.setattr(
+            Context,
+            "addonmanager",
+            FakeAddonManager(
+                FakeAddon("first", {"lookup": _empty_tuple}),
+                FakeAddon("second", {"lookup": second}),
+            ),
+        )
+        assert chain.run_module("lookup") == "second"
+
+    @pytest.mark.anyio
+    async def test_async_empty_tuple_result_continues_to_next_addon(
+        self, chain, monkeypatch
+    ):
+        async def second() -> str | None:
+            return "second"
+
+        monkeypatch.setattr(
+            Context,
+            "addonmanager",
+            FakeAddonManager(
+                FakeAddon("first", {"lookup": _empty_tuple}),
+                FakeAddon("second", {"lookup": second}),
+            ),
+        )
+        assert await chain.async_run_module("lookup") == "second"
+
+    def test_empty_tuple_from_addons_reaches_system_modules(self, chain, monkeypatch):
+        class Module:
+            def lookup(self) -> str | None:
+                return "module"
+
+        monkeypatch.setattr(
+            Context,
+            "addonmanager",
+            FakeAddonManager(FakeAddon("addon", {"lookup": _empty_tuple})),
+        )
+        monkeypatch.setattr(Context, "modulemanager", FakeModuleManager(Module()))
+        assert chain.run_module("lookup") == "module"
+
+    def test_addon_state_is_checked_on_each_dispatch(self, chain, monkeypatch):
+        addon = FakeAddon("addon", {"lookup": lambda: "addon"}, enabled=False)
+        monkeypatch.setattr(Context, "addonmanager", FakeAddonManager(addon))
+        assert chain.run_module("lookup") is None
+        addon.enabled = True
+        assert chain.run_module("lookup") == "addon"
+        addon.enabled = False
+        assert chain.run_module("lookup") is None
+
+    @pytest.mark.anyio
+    async def test_async_addon_state_is_checked_on_each_dispatch(
+        self, chain, monkeypatch
+    ):
+        addon = FakeAddon("addon", {"lookup": lambda: "addon"})
+        monkeypatch.setattr(Context, "addonmanager", FakeAddonManager(addon))
+        assert await chain.async_run_module("lookup") == "addon"
+        addon.enabled = False
+        assert await chain.async_run_module("lookup") is None
+
+    def test_addon_index_is_rebuilt_on_version_change(self, chain, monkeypatch):
+        addonmanager = FakeAddonManager(FakeAddon("old", {"lookup": lambda: "old"}))
+        monkeypatch.setattr(Context, "addonmanager", addonmanager)
+        assert chain.run_module("lookup") == "old"
+        addonmanager.running_addons = {
+            "new": FakeAddon("new", {"lookup": lambda: "new"})
+        }
+        # The index is kept until the addon manager reports a new version
+        assert chain.run_module("lookup") == "old"
+        addonmanager.version += 1
+        assert chain.run_module("lookup") == "new"
+
+    def test_module_index_is_rebuilt_on_version_change(self, chain, monkeypatch):
+        class Old:
+            def lookup(self) -> str:
+                return "old"
+
+        class New:
+            def lookup(self) -> str:
+                return "new"
+
+        modulemanager = FakeModuleManager(Old())
+        monkeypatch.setattr(Context, "modulemanager", modulemanager)
+        assert chain.run_module("lookup") == "old"
+        modulemanager.modules = [New()]
+        # The index is kept until the module manager reports a new version
+        assert chain.run_module("lookup") == "old"
+        modulemanager.version += 1
+        assert chain.run_module("lookup") == "new"
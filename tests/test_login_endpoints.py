@@ -0,0 +1,50 @@
+import pytest
+from starlette.responses import Response
+
+from app.api.endpoints import login
+
+
+@pytest.fixture
+def wallpaper_helper(monkeypatch):
+    class FakeWallpaperHelper:
+        url: str | None = None
+        urls: list[str] = []
+
+        async def async_get_wallpaper(self) -> str | None:
+            return self.url
+
+        async def async_get_wallpapers(self) -> list[str]:
+            return self.urls
+
+    monkeypatch.setattr(login, "WallpaperHelper", FakeWallpaperHelper)
+    return FakeWallpaperHelper
+
+
+class TestWallpaper:
+    @pytest.mark.anyio
+    async def test_found_wallpaper_is_cacheable(self, wallpaper_helper):
+        wallpaper_helper.url = "https://example.com/a.jpg"
+        response = Response()
+        result = await login.wallpaper(response)
+        assert result.success
+        assert "max-age=3600" in response.headers["Cache-Control"]
+
+    @pytest.mark.anyio
+    async def test_missing_wallpaper_is_not_cacheable(self, wallpaper_helper):
+        response = Response()
+        result = await login.wallpaper(response)
+        assert not result.success
+        assert "max-age=3600" not in response.headers.get("Cache-Control", "")
+
+    @pytest.mark.anyio
+    async def test_found_wallpapers_are_cacheable(self, wallpaper_helper):
+        wallpaper_helper.urls = ["https://example.com/a.jpg"]
+        response = Response()
+        assert await login.wallpapers(response) == wallpaper_helper.urls
+        assert "max-age=3600" in response.headers["Cache-Control"]
+
+    @pytest.mark.anyio
+    async def test_empty_wallpapers_are_not_cacheable(self, wallpaper_helper):
+        response = Response()
+        assert await login.wallpapers(response) == []
+        assert "max-age=3600" not in response.headers.get("Cache-Control", "")
@@ -0,0 +1,28 @@
+from app.utils.object import ObjectUtils
+
+
+def _typed(value: int, name: str):
+    pass
+
+
+def _untyped(value):
+    pass
+
+
+class TestCheckSignature:
+    def test_matches_annotated_types(self):
+        assert ObjectUtils.check_signature(_typed, 1, "a")
+        assert not ObjectUtils.check_signature(_typed, "a", "a")
+
+    def test_unannotated_parameter_accepts_anything(self):
+        assert ObjectUtils.check_signature(_untyped, object())
+
+    def test_argument_count_must_match(self):
+        assert not ObjectUtils.check_signature(_typed, 1)
+        assert not ObjectUtils.check_signature(_untyped, 1, 2)
+
+
+class TestGetParamTypes:
+    def test_one_type_per_parameter(self):
+        assert ObjectUtils.get_param_types(_typed) == [int, str]
+        assert ObjectUtils.get_param_types(_untyped) == [None]
@@ -0,0 +1,25 @@
+from app.core.security import (
+    UNUSABLE_PASSWORD_PREFIX,
+    get_password_hash,
+    get_unusable_password,
+    verify_password,
+)
+
+
+class TestVerifyPassword:
+    def test_verifies_the_hashed_password(self):
+        hashed_password = get_password_hash("secret")
+        assert verify_password("secret", hashed_password)
+        assert not verify_password("wrong", hashed_password)
+
+    def test_unusable_password_never_verifies(self):
+        unusable_password = get_unusable_password()
+        assert unusable_password.startswith(UNUSABLE_PASSWORD_PREFIX)
+        assert not verify_password(unusable_password, unusable_password)
+        assert not verify_password(
+            unusable_password.removeprefix(UNUSABLE_PASSWORD_PREFIX), unusable_password
+        )
+        assert not verify_password("", UNUSABLE_PASSWORD_PREFIX)
+
+    def test_unusable_passwords_are_unique(self):
+        assert get_unusable_password() != get_unusable_password()
@@ -0,0 +1,139 @@
+import uuid
+
+import pytest
+
+from app.chain import user as user_chain
+from app.chain.user import UserChain
+from app.core.security import (
+    UNUSABLE_PASSWORD_PREFIX,
+    get_password_hash,
+    get_unusable_password,
+)
+from app.db.user_oper import UserOper
+from app.schemas import AuthCredentials
+
+
+@pytest.fixture
+def verify_calls(monkeypatch) -> list[str]:
+    """Record the hashes the password is really verified against."""
+    calls = []
+    verify_password = user_chain.verify_password
+
+    def counting_verify_password(password: str, hashed_password: str) -> bool:
+        calls.append(hashed_password)
+        return verify_password(password, hashed_password)
+
+    monkeypatch.setattr(user_chain, "verify_password", counting_verify_password)
+    user_chain._verified_passwords.clear()
+    user_chain._rejected_passwords.clear()
+    return calls
+
+
+@pytest.fixture
+def username() -> str:
+    return f"user-{uuid.uuid4().hex}"
+
+
+class TestVerifyPassword:
+    def test_verified_password_is_cached(self, verify_calls, username):
+        hashed_password = get_password_hash("secret")
+        assert UserChain._verify_password(username, "secret", hashed_password)
+        assert UserChain._verify_password(username, "secret", hashed_password)
+        assert verify_calls == [hashed_password]
+
+    def test_rejected_password_is_cached(self, verify_calls, username):
+        hashed_password = get_password_hash("secret")
+        assert not UserChain._verify_password(username, "wrong", hashed_password)
+        assert not UserChain._verify_password(username, "wrong", hashed_password)
+        assert verify_calls == [hashed_password]
+
+    def test_password_change_invalidates_the_verified_password(
+        self, verify_calls, username
+    ):
+        old_hash = get_password_hash("old")
+        new_hash = get_password_hash("new")
+        assert UserChain._verify_password(username, "old", old_hash)
+        assert not UserChain._verify_password(username, "old", new_hash)
+        assert verify_calls == [old_hash, new_hash]
+
+    def test_password_change_invalidates_the_rejected_password(
+        self, verify_calls, username
+    ):
+        old_hash = get_password_hash("old")
+        new_hash = get_password_hash("new")
+        assert not UserChain._verify_password(username, "new", old_hash)
+        assert UserChain._verify_password(username, "new", new_hash)
+        assert verify_calls == [old_hash, new_hash]
+
+    def test_cache_is_keyed_by_user_and_password(self, verify_calls, username):
+        hashed_password = get_password_hash("secret")
+        assert UserChain._verify_password(username, "secret", hashed_password)
+        assert not UserChain._verify_password(username, "other", hashed_password)
+        assert UserChain._verify_password(f"{username}-2", "secret", hashed_password)
+        assert len(verify_calls) == 3
+
+    def test_unusable_password_never_verifies(self, verify_calls, username):
+        unusable_password = get_unusable_password()
+        assert not UserChain._verify_password(
+            username, unusable_password, unusable_password
+        )
+        assert not UserChain._verify_password(
+            username, UNUSABLE_PASSWORD_PREFIX, UNUSABLE_PASSWORD_PREFIX
+        )
+
+
+class TestPasswordAuthenticate:
+    @staticmethod
+    def _credentials(username: str, password: str) -> AuthCredentials:
+        return AuthCredentials(
+            username=username, password=password, grant_type="password"
+        )
+
+    @pytest.mark.anyio
+    async def test_authenticates_an_active_user(self, verify_calls, username):
+        UserOper().add(
+            name=username, hashed_password=get_password_hash("secret"), is_active=True
+        )
+        success, user = await UserChain.async_password_authenticate(
+            self._credentials(username, "secret")
+        )
+        assert success
+        assert user.name == username
+        success, _ = await UserChain.async_password_authenticate(
+            self._credentials(username, "wrong")
+        )
+        assert not success
+
+    @pytest.mark.anyio
+    async def test_disabled_user_is_rejected(self, verify_calls, username):
+        UserOper().add(
+            name=username, hashed_password=get_password_hash("secret"), is_active=False
+        )
+        success, _ = await UserChain.async_password_authenticate(
+            self._credentials(username, "secret")
+        )
+        assert not success
+        # The stored hash is not checked, only the unusable password
+        assert verify_calls == [UNUSABLE_PASSWORD_PREFIX]
+
+    @pytest.mark.anyio
+    async def test_repeated_unknown_user_is_rejected_from_the_cache(
+        self, verify_calls, username
+    ):
+        for _ in range(2):
+            success, _ = await UserChain.async_password_authenticate(
+                self._credentials(username, "secret")
+            )
+            assert not success
+        assert verify_calls == [UNUSABLE_PASSWORD_PREFIX]
+
+    @pytest.mark.anyio
+    async def test_user_created_by_auxiliary_login_cannot_use_a_password(
+        self, verify_calls, username
+    ):
+        unusable_password = get_unusable_password()
+        UserOper().add(name=username, hashed_password=unusable_password, is_active=True)
+        success, _ = await UserChain.async_password_authenticate(
+            self._credentials(username, unusable_password)
+        )
+        assert not success